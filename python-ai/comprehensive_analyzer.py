@@ -8,6 +8,9 @@ This module provides the ComprehensiveImageAnalyzer class which performs
 - Pass 3: Quality & Technical Analysis
 - Pass 4: Context & Metadata Generation
 
+Pass 1 runs first because later passes take its findings as context; passes
+2-4 are independent of each other and run concurrently.
+
 Estimated time: 40-60 seconds per image (quality-first approach).
 """
 
@@ -20,6 +23,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from PIL import Image
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 from prompts import (
     CONTENT_ANALYSIS_PROMPT,
@@ -321,13 +325,38 @@ class ComprehensiveImageAnalyzer:
                 passes = get_comprehensive_passes()  # ["content", "people", "quality", "context"]
                 previous_analysis = {}
 
-                for pass_type in passes:
-                    pass_result = self._run_single_pass(
+                # Only the content pass feeds context into the others (see
+                # format_prompt_with_context), so run it first and the rest in parallel
+                pass_results = []
+                remaining = list(passes)
+                if self.enable_context_chaining and "content" in remaining:
+                    remaining.remove("content")
+                    content_result = self._run_single_pass(
                         image_base64,
-                        pass_type,
-                        previous_analysis=previous_analysis,
+                        "content",
                         image_metadata=image_metadata,
                     )
+                    pass_results.append(content_result)
+                    if content_result.success:
+                        previous_analysis["content"] = content_result.data
+
+                if remaining:
+                    content_context = dict(previous_analysis)
+                    with ThreadPoolExecutor(max_workers=len(remaining)) as executor:
+                        futures = [
+                            executor.submit(
+                                self._run_single_pass,
+                                image_base64,
+                                pass_type,
+                                previous_analysis=content_context,
+                                image_metadata=image_metadata,
+                            )
+                            for pass_type in remaining
+                        ]
+                        pass_results.extend(future.result() for future in futures)
+
+                for pass_result in pass_results:
+                    pass_type = pass_result.pass_type
                     result.pass_results.append(pass_result)
 
                     if pass_result.success:
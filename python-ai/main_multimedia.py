@@ -9,15 +9,31 @@ from transformers import BlipProcessor, BlipForConditionalGeneration
 from transformers import CLIPProcessor, CLIPModel
 from transformers import AutoProcessor, AutoModelForCausalLM
 import torch
+from torchvision import transforms
 from PIL import Image
 import numpy as np
 from pathlib import Path
 import logging
 import face_recognition
+import dlib
 import cv2
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Iterator
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import textwrap
+import asyncio
+import functools
+import contextlib
+import threading
+import subprocess
+import time
+import hashlib
+import sqlite3
+import tempfile
+import re
+import base64
+from io import BytesIO
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 import os
 
 # Register HEIF/HEIC support
@@ -74,6 +90,19 @@ except ImportError:
     PADDLE_OCR = None
     PADDLEOCR_AVAILABLE = False
     logging.warning("PaddleOCR not available")
+paddle_ocr_lock = threading.Lock()
+# A PaddleOCR instance is not thread-safe; requests run in worker threads, so
+# recognition calls on the shared instance are serialized
+paddle_ocr_run_lock = threading.Lock()
+
+# PyMuPDF - in-process PDF rendering and native text extraction
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    fitz = None
+    PYMUPDF_AVAILABLE = False
+    logging.warning("PyMuPDF not available, PDF rendering falls back to pdf2image")
 
 # At least one OCR engine must be available
 OCR_AVAILABLE = TESSERACT_AVAILABLE or PADDLEOCR_AVAILABLE
@@ -86,6 +115,47 @@ if not OCR_AVAILABLE:
 # Set VIDEO_WORKERS env variable to override
 MAX_VIDEO_WORKERS = int(os.getenv('VIDEO_WORKERS', '4'))
 
+# Number of video keyframes captioned per BLIP generate() call
+# Default: 8 (keeps beam-search memory modest on small GPUs)
+# Set BLIP_BATCH_SIZE env variable to override
+BLIP_BATCH_SIZE = max(1, int(os.getenv('BLIP_BATCH_SIZE', '8')))
+
+# Number of concurrent OCR workers for multi-page PDFs (Tesseract only)
+# Default: number of CPU cores
+# Set OCR_WORKERS env variable to override
+OCR_WORKERS = max(1, int(os.getenv('OCR_WORKERS', str(os.cpu_count() or 1))))
+
+# Pages whose native text layer has at least this many characters are not OCR'd
+PDF_PAGE_TEXT_MIN_CHARS = 50
+
+# Number of PDF pages OCR'd per Tesseract process (each process loads the
+# language model once for the whole batch)
+# Default: 4
+# Set TESSERACT_PAGES_PER_CALL env variable to override
+TESSERACT_PAGES_PER_CALL = max(1, int(os.getenv('TESSERACT_PAGES_PER_CALL', '4')))
+
+# Number of PDF pages pdf2image renders per call when PyMuPDF is unavailable
+PDF_RENDER_CHUNK_PAGES = 10
+
+# A PDF whose first this-many pages have no native text is treated as scanned
+# and sent straight to OCR
+PDF_TEXT_PROBE_PAGES = 3
+
+# Number of text-line crops PaddleOCR recognizes per batch
+# Default: 16 (dense scanned pages often yield 30+ lines)
+# Set PADDLE_OCR_BATCH_SIZE env variable to override
+PADDLE_OCR_BATCH_SIZE = int(os.getenv('PADDLE_OCR_BATCH_SIZE', '16'))
+
+# Decimal places kept when embeddings are serialized to JSON; 6 places changes the
+# cosine similarity of a unit vector by < 1e-6
+EMBEDDING_DECIMALS = 6
+
+# Texts up to this length get their CLIP embedding memoized (LRU, 4096 entries)
+TEXT_EMBEDDING_CACHE_MAX_CHARS = 1024
+
+# Leading words of a text handed to the CLIP tokenizer (>= its 77-token limit)
+CLIP_MAX_WORDS = 77
+
 # Scene detection configuration
 # Threshold for detecting scene changes (0-1, higher = more sensitive)
 # Default: 0.3 (detects significant scene changes)
@@ -97,11 +167,73 @@ SCENE_THRESHOLD = float(os.getenv('SCENE_THRESHOLD', '0.3'))
 # Set MIN_SCENE_DURATION env variable to override
 MIN_SCENE_DURATION = int(os.getenv('MIN_SCENE_DURATION', '15'))
 
+# Compile the BLIP and CLIP vision encoders with torch.compile at startup
+# Default: disabled (compilation adds startup time and needs a C compiler)
+# Set TORCH_COMPILE=1 env variable to enable
+TORCH_COMPILE = os.getenv('TORCH_COMPILE', '0') == '1'
+
+# torch.compile mode used with TORCH_COMPILE
+# Default: "default"; "reduce-overhead" additionally captures CUDA graphs per
+# input shape (one launch per forward, at the cost of a capture per batch size)
+# Set TORCH_COMPILE_MODE env variable to override
+TORCH_COMPILE_MODE = os.getenv('TORCH_COMPILE_MODE', 'default')
+
+# Quantize BLIP's Linear layers to int8 (dynamic quantization) when running on CPU
+# Default: disabled
+# Set CPU_INT8_QUANTIZE=1 env variable to enable
+CPU_INT8_QUANTIZE = os.getenv('CPU_INT8_QUANTIZE', '0') == '1'
+
+# Face detection runs on a copy shrunk to at most this many pixels on the longer
+# side (boxes are scaled back; encodings still use the full-resolution image)
+# Default: 1000 (faces smaller than ~1/12 of a 4000px photo's height may be missed)
+# Set FACE_DETECTION_MAX_SIDE env variable to override (0 disables downscaling)
+FACE_DETECTION_MAX_SIDE = int(os.getenv('FACE_DETECTION_MAX_SIDE', '1000'))
+
+# dlib's CNN face detector is only worth it when dlib itself was built with CUDA
+FACE_DETECTION_MODEL = "cnn" if getattr(dlib, "DLIB_USE_CUDA", False) else "hog"
+
+# Longer side (pixels) frames are shrunk to before scene-detection histograms
+SCENE_HIST_MAX_SIDE = 320
+
+# Shared worker pool for per-frame video work (created once, reused across requests)
+video_executor = ThreadPoolExecutor(max_workers=MAX_VIDEO_WORKERS, thread_name_prefix="video")
+
+# Email body budget
+# Once this many characters of text/plain body have been decoded, remaining
+# text parts are skipped (attachments are still counted)
+EMAIL_BODY_MAX_CHARS = 64 * 1024
+
+# Number of sheets sampled from a spreadsheet (.xlsx/.xls/.ods)
+# Default: 3
+# Set SPREADSHEET_MAX_SHEETS env variable to override
+SPREADSHEET_MAX_SHEETS = max(1, int(os.getenv('SPREADSHEET_MAX_SHEETS', '3')))
+
+# Number of leading bytes handed to chardet for encoding detection
+ENCODING_SNIFF_BYTES = 64 * 1024
+
+# SQLite cache of Ollama document-analysis responses, keyed by model + prompt
+# Default: ~/.cache/project-eye/ollama_cache.sqlite
+# Set OLLAMA_CACHE_PATH env variable to override (empty string disables the cache)
+OLLAMA_CACHE_PATH = os.getenv('OLLAMA_CACHE_PATH', str(Path.home() / '.cache' / 'project-eye' / 'ollama_cache.sqlite'))
+
+# Documents with less extracted text than this skip Ollama analysis entirely
+OLLAMA_MIN_TEXT_CHARS = 200
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Avinash-EYE Multi-Media AI Service")
+# orjson serializes the large float lists (embeddings, face encodings) several
+# times faster than the stdlib encoder; fall back to it when not installed.
+# (uvicorn[standard] already runs the event loop on uvloop.)
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+    logger.info("Using orjson for JSON responses")
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
+
+app = FastAPI(title="Avinash-EYE Multi-Media AI Service", default_response_class=DefaultResponse)
 
 # Global variables for models
 blip_processor = None
@@ -117,6 +249,20 @@ aimv2_model = None
 whisper_model = None
 device = None
 
+# Shared matplotlib (figure, axes) for waveform thumbnails, created on first use
+audio_thumbnail_figure = None
+audio_thumbnail_lock = threading.Lock()
+
+# Whisper installs per-call KV-cache hooks on the shared model, so concurrent
+# transcriptions (endpoints run in worker threads) must take turns
+whisper_lock = threading.Lock()
+# Guards the lazy Whisper load so concurrent first requests load it only once
+whisper_load_lock = threading.Lock()
+
+# Ollama response cache connection (None = not opened yet, False = unavailable)
+ollama_cache_conn = None
+ollama_cache_lock = threading.Lock()
+
 
 def extract_json_from_response(text: str) -> Optional[dict]:
     """
@@ -129,8 +275,6 @@ def extract_json_from_response(text: str) -> Optional[dict]:
     Returns:
         Parsed dict if valid JSON found, None otherwise
     """
-    import re
-
     if not text or not isinstance(text, str):
         return None
 
@@ -312,7 +456,7 @@ class AnalyzeVideoResponse(BaseModel):
     fps: float
     resolution: str
     scene_descriptions: List[Dict[str, Any]] = []
-    embedding: List[float]  # Average embedding of key frames
+    embedding: Optional[List[float]] = None  # Average embedding of key frames (None if no frames were embedded)
     objects_detected: List[str] = []
     thumbnail_path: Optional[str] = None  # Path to generated thumbnail (JPEG)
 
@@ -323,7 +467,7 @@ class AnalyzeDocumentResponse(BaseModel):
     page_count: Optional[int] = None
     summary: Optional[str] = None
     keywords: List[str] = []
-    embedding: List[float]
+    embedding: Optional[List[float]] = None  # None when no text was extracted
     thumbnail_path: Optional[str] = None  # Path to generated thumbnail (JPEG)
     # Intelligent document analysis fields
     document_type: Optional[str] = None  # Classified document type (invoice, receipt, etc.)
@@ -336,7 +480,7 @@ class TranscribeAudioResponse(BaseModel):
     text: str
     language: str
     confidence: float
-    embedding: List[float]
+    embedding: Optional[List[float]] = None  # None when the transcript is empty
     thumbnail_path: Optional[str] = None  # Path to generated waveform thumbnail (JPEG)
 
 
@@ -379,13 +523,21 @@ class AnalyzeCodeFileResponse(BaseModel):
 @app.on_event("startup")
 async def load_models():
     """Load AI models on startup."""
-    global blip_processor, blip_model, clip_processor, clip_model, whisper_model, device
+    global blip_processor, blip_model, clip_processor, clip_model, device
 
     logger.info("Starting multi-media model loading process...")
 
     # Determine device
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     logger.info(f"Using device: {device}")
+    if device.type == "cuda":
+        # Input shapes are fixed per model (224px crops, 77 tokens), so let cuDNN
+        # pick the fastest kernels once and reuse them
+        torch.backends.cudnn.benchmark = True
+        # Allow TF32 Tensor Core matmuls for whatever still runs in float32
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.set_float32_matmul_precision("high")
 
     try:
         # Load BLIP model for image captioning
@@ -394,6 +546,11 @@ async def load_models():
         blip_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-large")
         blip_model.to(device)
         blip_model.eval()
+        if CPU_INT8_QUANTIZE and device.type == "cpu":
+            # Captions are regenerated text, not stored vectors, so int8 weights
+            # can't drift anything already indexed
+            blip_model = torch.ao.quantization.quantize_dynamic(blip_model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info("BLIP Linear layers quantized to int8")
         logger.info("BLIP model loaded successfully!")
 
         # Load CLIP model for embeddings
@@ -404,11 +561,12 @@ async def load_models():
         clip_model.eval()
         logger.info("CLIP model loaded successfully!")
 
-        # Load Whisper model for audio transcription
-        if WHISPER_AVAILABLE:
-            logger.info("Loading Whisper model...")
-            whisper_model = whisper.load_model("base")
-            logger.info("Whisper model loaded successfully!")
+        if TORCH_COMPILE:
+            compile_vision_encoders()
+
+        # Whisper is loaded on the first audio request (see get_whisper_model)
+
+        warm_up_models()
 
         logger.info("All models loaded and ready!")
 
@@ -417,21 +575,173 @@ async def load_models():
         raise
 
 
+def warm_up_models():
+    """
+    Run one dummy inference through BLIP and CLIP (the startup-loaded models).
+
+    The first call pays for CUDA context and kernel initialization, cuDNN
+    autotuning and lazy buffer allocation; doing it here keeps that off the
+    first real request. Failures are logged and ignored.
+    """
+    try:
+        start = time.time()
+        dummy = Image.new("RGB", (224, 224))
+        generate_caption_blip(dummy)
+        generate_image_embeddings_clip([dummy])
+        generate_text_embeddings(["warm up"])
+        logger.info(f"Models warmed up in {time.time() - start:.1f}s")
+    except Exception as e:
+        logger.warning(f"Model warm-up failed: {str(e)}")
+
+
+def compile_vision_encoders():
+    """
+    Compile the BLIP and CLIP vision encoders with torch.compile and warm them up.
+
+    Only the encoders are compiled; BLIP's generate() loop stays eager. A dummy
+    image is pushed through both so the first real request doesn't pay the
+    compilation cost. Any failure leaves the models running eagerly.
+    """
+    blip_vision, clip_vision = blip_model.vision_model, clip_model.vision_model
+    try:
+        logger.info(f"Compiling BLIP and CLIP vision encoders with torch.compile (mode={TORCH_COMPILE_MODE})...")
+        blip_model.vision_model = torch.compile(blip_vision, mode=TORCH_COMPILE_MODE)
+        clip_model.vision_model = torch.compile(clip_vision, mode=TORCH_COMPILE_MODE)
+
+        dummy = Image.new("RGB", (224, 224))
+        generate_image_embeddings_clip([dummy])
+        generate_caption_blip(dummy)
+        logger.info("Vision encoders compiled and warmed up")
+    except Exception as e:
+        logger.warning(f"torch.compile failed, using eager models: {str(e)}")
+        blip_model.vision_model, clip_model.vision_model = blip_vision, clip_vision
+
+
+@app.on_event("startup")
+async def warm_up_ocr():
+    """Initialize PaddleOCR in the background so the first OCR request doesn't pay for it."""
+    if PADDLEOCR_AVAILABLE:
+        threading.Thread(target=get_paddle_ocr, name="paddle-ocr-warmup", daemon=True).start()
+
+
 # ===== IMAGE PROCESSING =====
 
-def generate_caption_blip(image: Image.Image) -> str:
-    """Generate caption using BLIP."""
-    inputs = blip_processor(image, return_tensors="pt").to(device)
+def _autocast():
+    """
+    Mixed-precision context for model forwards: float16 autocast on CUDA, a no-op
+    elsewhere (CPU and MPS keep float32).
+
+    Weights stay float32, so callers cast outputs back with .float() before
+    normalizing or converting to NumPy.
+    """
+    if device is not None and device.type == "cuda":
+        return torch.autocast(device_type="cuda", dtype=torch.float16)
+    return contextlib.nullcontext()
 
-    with torch.no_grad():
+
+# torchvision pipelines equivalent to the HF image processors, keyed by id(processor)
+_image_transforms: Dict[int, Optional[transforms.Compose]] = {}
+
+_PIL_TO_TORCHVISION_INTERPOLATION = {
+    Image.Resampling.NEAREST: transforms.InterpolationMode.NEAREST,
+    Image.Resampling.BILINEAR: transforms.InterpolationMode.BILINEAR,
+    Image.Resampling.BICUBIC: transforms.InterpolationMode.BICUBIC,
+    Image.Resampling.LANCZOS: transforms.InterpolationMode.LANCZOS,
+}
+
+
+def _center_crop_floor(crop_height: int, crop_width: int) -> transforms.Lambda:
+    """
+    Center crop with the HF image processors' offsets.
+
+    HF takes the top-left corner as (size - crop) // 2, while torchvision's CenterCrop
+    rounds (size - crop) / 2, which lands one pixel further when the difference is odd.
+    """
+    return transforms.Lambda(lambda image: transforms.functional.crop(
+        image,
+        (image.height - crop_height) // 2,
+        (image.width - crop_width) // 2,
+        crop_height,
+        crop_width,
+    ))
+
+
+def _build_image_transform(image_processor) -> Optional[transforms.Compose]:
+    """
+    Translate an HF CLIP-style image processor config into one torchvision pipeline.
+
+    Returns None for configurations this doesn't cover; callers then use the HF
+    processor itself.
+    """
+    try:
+        if not (image_processor.do_resize and image_processor.do_rescale and image_processor.do_normalize):
+            return None
+        if abs(image_processor.rescale_factor - 1 / 255) > 1e-9:
+            return None
+
+        interpolation = _PIL_TO_TORCHVISION_INTERPOLATION[Image.Resampling(int(image_processor.resample))]
+        size = image_processor.size
+        if "shortest_edge" in size:
+            steps = [transforms.Resize(size["shortest_edge"], interpolation=interpolation)]
+        else:
+            steps = [transforms.Resize((size["height"], size["width"]), interpolation=interpolation)]
+        if getattr(image_processor, "do_center_crop", False):
+            crop = image_processor.crop_size
+            steps.append(_center_crop_floor(crop["height"], crop["width"]))
+        steps += [
+            transforms.ToTensor(),
+            transforms.Normalize(mean=image_processor.image_mean, std=image_processor.image_std),
+        ]
+        return transforms.Compose(steps)
+    except Exception as e:
+        logger.warning(f"Falling back to the HF image processor: {str(e)}")
+        return None
+
+
+def _preprocess_images(processor, images: List[Image.Image]) -> torch.Tensor:
+    """
+    Turn PIL images into a pixel_values batch on the model device.
+
+    Uses a torchvision pipeline built once per processor (PIL resize/crop, then C
+    tensor conversion and normalization) instead of the HF processor's per-call
+    NumPy pipeline.
+    """
+    image_processor = getattr(processor, "image_processor", processor)
+    key = id(image_processor)
+    if key not in _image_transforms:
+        _image_transforms[key] = _build_image_transform(image_processor)
+    transform = _image_transforms[key]
+
+    if transform is None:
+        return processor(images=images, return_tensors="pt")["pixel_values"].to(device)
+    pixel_values = torch.stack([
+        transform(image if image.mode == "RGB" else image.convert("RGB")) for image in images
+    ])
+    if device.type == "cuda":
+        # A page-locked batch is copied by DMA without stalling the host thread; the
+        # forward pass is queued on the same stream, so it still sees the data
+        return pixel_values.pin_memory().to(device, non_blocking=True)
+    return pixel_values.to(device)
+
+
+def generate_captions_blip(images: List[Image.Image]) -> List[str]:
+    """Generate captions for a batch of images with one BLIP generate() call."""
+    pixel_values = _preprocess_images(blip_processor, images)
+
+    with torch.no_grad(), _autocast():
         out = blip_model.generate(
-            **inputs,
+            pixel_values=pixel_values,
             max_length=150,
             num_beams=5,
             temperature=1.0
         )
 
-    return blip_processor.decode(out[0], skip_special_tokens=True)
+    return blip_processor.batch_decode(out, skip_special_tokens=True)
+
+
+def generate_caption_blip(image: Image.Image) -> str:
+    """Generate caption using BLIP."""
+    return generate_captions_blip([image])[0]
 
 
 def get_florence_model():
@@ -509,24 +819,48 @@ def generate_caption(image: Image.Image, model: str = "blip") -> str:
         return generate_caption_blip(image)
 
 
-def detect_faces(image: Image.Image) -> Dict:
-    """Detect faces in image and return locations and encodings."""
+def detect_faces(image: Image.Image, img_array: Optional[np.ndarray] = None) -> Dict:
+    """
+    Detect faces in image and return locations and encodings.
+
+    Encodings are one contiguous float32 array of shape (count, 128); convert with
+    .tolist() only when building the response. Pass img_array to reuse an RGB
+    array the caller already built from image.
+    """
     try:
-        img_array = np.array(image)
-        face_locations = face_recognition.face_locations(img_array)
+        if img_array is None:
+            img_array = np.array(image)
+
+        # Detection cost grows with pixel count, so find faces on a downscaled copy
+        # and map the boxes (top, right, bottom, left) back to full resolution
+        height, width = img_array.shape[:2]
+        scale = FACE_DETECTION_MAX_SIDE / max(height, width) if FACE_DETECTION_MAX_SIDE > 0 else 1
+        if scale < 1:
+            small = cv2.resize(img_array, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+            face_locations = [
+                (
+                    max(0, int(top / scale)),
+                    min(width, int(right / scale)),
+                    min(height, int(bottom / scale)),
+                    max(0, int(left / scale))
+                )
+                for top, right, bottom, left in face_recognition.face_locations(small, model=FACE_DETECTION_MODEL)
+            ]
+        else:
+            face_locations = face_recognition.face_locations(img_array, model=FACE_DETECTION_MODEL)
 
-        face_encodings = []
+        face_encodings = np.empty((0, 128), dtype=np.float32)
         if face_locations:
-            face_encodings = face_recognition.face_encodings(img_array, face_locations)
+            face_encodings = np.asarray(face_recognition.face_encodings(img_array, face_locations), dtype=np.float32)
 
         return {
             "count": len(face_locations),
             "locations": face_locations,
-            "encodings": [encoding.tolist() for encoding in face_encodings]
+            "encodings": face_encodings
         }
     except Exception as e:
         logger.error(f"Face detection failed: {str(e)}")
-        return {"count": 0, "locations": [], "encodings": []}
+        return {"count": 0, "locations": [], "encodings": np.empty((0, 128), dtype=np.float32)}
 
 
 # ============================================================================
@@ -615,7 +949,6 @@ def detect_objects_florence(image: Image.Image) -> Dict:
             logger.warning(f"Object detection returned no labels. Raw output type: {type(parsed)}, keys: {parsed.keys() if isinstance(parsed, dict) else 'N/A'}")
 
         # Count label occurrences
-        from collections import Counter
         label_counts = dict(Counter(labels))
 
         logger.info(f"Object detection found {len(labels)} objects: {label_counts}")
@@ -672,7 +1005,6 @@ def extract_dominant_colors(image: Image.Image, n_colors: int = 5) -> List[Dict]
         labels = kmeans.labels_
 
         # Calculate percentage for each color
-        from collections import Counter
         label_counts = Counter(labels)
         total = len(labels)
 
@@ -742,16 +1074,19 @@ def _get_color_name(r: int, g: int, b: int) -> str:
             return "blue"
 
 
-def analyze_image_quality(image: Image.Image) -> Dict:
+def analyze_image_quality(image: Image.Image, img_array: Optional[np.ndarray] = None) -> Dict:
     """
     Analyze image quality using OpenCV metrics.
 
+    Pass img_array to reuse an RGB array the caller already built from image.
+
     Returns:
         Dict with overall_score, sharpness, brightness, contrast, saturation, noise, and issues
     """
     try:
         # Convert PIL to OpenCV format
-        img_array = np.array(image)
+        if img_array is None:
+            img_array = np.array(image)
         if len(img_array.shape) == 2:
             gray = img_array
             img_bgr = cv2.cvtColor(img_array, cv2.COLOR_GRAY2BGR)
@@ -865,8 +1200,8 @@ def compute_perceptual_hashes(image: Image.Image) -> Dict[str, str]:
     try:
         import imagehash
 
-        # Ensure image is in a format imagehash can process
-        img = image.copy()
+        # Ensure image is in a format imagehash can process (hashing never mutates it)
+        img = image
         if img.mode not in ('RGB', 'L'):
             img = img.convert('RGB')
 
@@ -910,8 +1245,6 @@ def classify_scene_ollama(image: Image.Image, ollama_model: str = "llava:13b-v1.
         models_to_try.append("llava:latest")
 
     try:
-        import base64
-        from io import BytesIO
 
         # Convert image to base64
         img = image.copy()
@@ -977,15 +1310,21 @@ Return ONLY valid JSON, no other text."""
         return {}
 
 
-def generate_image_embedding_clip(image: Image.Image) -> np.ndarray:
-    """Generate normalized embedding vector using CLIP."""
-    inputs = clip_processor(images=image, return_tensors="pt").to(device)
+def generate_image_embeddings_clip(images: List[Image.Image]) -> np.ndarray:
+    """Generate normalized CLIP embeddings for a batch of images (one row per image)."""
+    pixel_values = _preprocess_images(clip_processor, images)
+
+    with torch.inference_mode(), _autocast():
+        image_features = clip_model.get_image_features(pixel_values=pixel_values)
 
-    with torch.no_grad():
-        image_features = clip_model.get_image_features(**inputs)
+    image_features = image_features.float()
+    embeddings = image_features / image_features.norm(dim=-1, keepdim=True)
+    return embeddings.cpu().numpy()
 
-    embedding = image_features / image_features.norm(dim=-1, keepdim=True)
-    return embedding.cpu().numpy().flatten()
+
+def generate_image_embedding_clip(image: Image.Image) -> np.ndarray:
+    """Generate normalized embedding vector using CLIP."""
+    return generate_image_embeddings_clip([image])[0]
 
 
 def get_siglip_model():
@@ -1008,25 +1347,31 @@ def get_siglip_model():
     return siglip_processor, siglip_model
 
 
-def generate_image_embedding_siglip(image: Image.Image) -> np.ndarray:
-    """Generate normalized embedding vector using SigLIP."""
+def generate_image_embeddings_siglip(images: List[Image.Image]) -> np.ndarray:
+    """Generate normalized SigLIP embeddings for a batch of images (one row per image)."""
     processor, model = get_siglip_model()
     if processor is None or model is None:
         logger.warning("SigLIP not available, falling back to CLIP")
-        return generate_image_embedding_clip(image)
+        return generate_image_embeddings_clip(images)
 
     try:
-        inputs = processor(images=image, return_tensors="pt").to(device)
+        pixel_values = _preprocess_images(processor, images)
 
-        with torch.no_grad():
-            outputs = model.get_image_features(**inputs)
+        with torch.inference_mode(), _autocast():
+            outputs = model.get_image_features(pixel_values=pixel_values)
 
-        embedding = outputs / outputs.norm(dim=-1, keepdim=True)
-        return embedding.cpu().numpy().flatten()
+        outputs = outputs.float()
+        embeddings = outputs / outputs.norm(dim=-1, keepdim=True)
+        return embeddings.cpu().numpy()
 
     except Exception as e:
         logger.error(f"SigLIP embedding failed: {str(e)}")
-        return generate_image_embedding_clip(image)
+        return generate_image_embeddings_clip(images)
+
+
+def generate_image_embedding_siglip(image: Image.Image) -> np.ndarray:
+    """Generate normalized embedding vector using SigLIP."""
+    return generate_image_embeddings_siglip([image])[0]
 
 
 def get_aimv2_model():
@@ -1059,22 +1404,22 @@ def get_aimv2_model():
     return aimv2_processor, aimv2_model
 
 
-def generate_image_embedding_aimv2(image: Image.Image) -> np.ndarray:
+def generate_image_embeddings_aimv2(images: List[Image.Image]) -> np.ndarray:
     """
-    Generate normalized embedding vector using AIMv2 (Apple's model).
+    Generate normalized AIMv2 embeddings for a batch of images (one row per image).
 
     AIMv2 outperforms CLIP and SigLIP for image understanding and retrieval.
     """
     processor, model = get_aimv2_model()
     if processor is None or model is None:
         logger.warning("AIMv2 not available, falling back to SigLIP")
-        return generate_image_embedding_siglip(image)
+        return generate_image_embeddings_siglip(images)
 
     try:
-        inputs = processor(images=image, return_tensors="pt").to(device)
+        pixel_values = _preprocess_images(processor, images)
 
-        with torch.no_grad():
-            outputs = model(inputs["pixel_values"])
+        with torch.inference_mode(), _autocast():
+            outputs = model(pixel_values)
 
         # AIMv2 returns features that need to be extracted
         # Use the pooled output or mean of last hidden state
@@ -1082,15 +1427,25 @@ def generate_image_embedding_aimv2(image: Image.Image) -> np.ndarray:
             features = outputs.pooler_output
         else:
             # Use mean pooling of last hidden state
-            features = outputs.last_hidden_state.mean(dim=1)
+            features = outputs.last_hidden_state.float().mean(dim=1)
+        features = features.float()
 
-        # Normalize the embedding
-        embedding = features / features.norm(dim=-1, keepdim=True)
-        return embedding.cpu().numpy().flatten()
+        # Normalize the embeddings
+        embeddings = features / features.norm(dim=-1, keepdim=True)
+        return embeddings.cpu().numpy()
 
     except Exception as e:
         logger.error(f"AIMv2 embedding failed: {str(e)}, falling back to SigLIP")
-        return generate_image_embedding_siglip(image)
+        return generate_image_embeddings_siglip(images)
+
+
+def generate_image_embedding_aimv2(image: Image.Image) -> np.ndarray:
+    """
+    Generate normalized embedding vector using AIMv2 (Apple's model).
+
+    AIMv2 outperforms CLIP and SigLIP for image understanding and retrieval.
+    """
+    return generate_image_embeddings_aimv2([image])[0]
 
 
 def generate_image_embedding(image: Image.Image, model: str = "aimv2") -> np.ndarray:
@@ -1116,13 +1471,31 @@ def generate_image_embedding(image: Image.Image, model: str = "aimv2") -> np.nda
         return generate_image_embedding_clip(image)
 
 
-def generate_thumbnail(image_path: str, max_size: tuple = (800, 800)) -> Optional[str]:
+def generate_image_embeddings(images: List[Image.Image], model: str = "aimv2") -> np.ndarray:
+    """
+    Generate embeddings for several images in one batched forward pass.
+
+    Same models and fallbacks as generate_image_embedding; returns an array with
+    one normalized row per image.
+    """
+    model_lower = model.lower()
+    if model_lower == "aimv2":
+        return generate_image_embeddings_aimv2(images)
+    elif model_lower == "siglip":
+        return generate_image_embeddings_siglip(images)
+    else:
+        return generate_image_embeddings_clip(images)
+
+
+def generate_thumbnail(image_path: str, max_size: tuple = (800, 800), image: Optional[Image.Image] = None) -> Optional[str]:
     """
     Generate a browser-compatible JPEG thumbnail for any image format.
 
     Args:
         image_path: Path to the original image file
         max_size: Maximum dimensions (width, height) for the thumbnail
+        image: Already-decoded RGB image of image_path, reused instead of decoding
+            the file again (JPEGs are still re-read, see below)
 
     Returns:
         Path to the generated thumbnail or None if generation fails
@@ -1141,14 +1514,31 @@ def generate_thumbnail(image_path: str, max_size: tuple = (800, 800)) -> Optiona
         thumbnail_filename = original_path.stem + '.jpg'
         thumbnail_path = thumbnail_dir / thumbnail_filename
 
-        # Open and convert the image
-        image = Image.open(image_path).convert("RGB")
+        # Open the image (header only until pixels are needed). For JPEGs, draft()
+        # lets libjpeg-turbo decode straight to the smallest 1/2, 1/4 or 1/8 scale
+        # still >= max_size, which is cheaper than downscaling a full decode. Other
+        # formats (HEIC, PNG, ...) reuse the caller's decoded image when given.
+        source = Image.open(image_path)
+        if image is not None and source.format != "JPEG":
+            source.close()
+            # Resize straight from the caller's image (same aspect-preserving,
+            # never-upscaling fit as thumbnail()) instead of copying it at full
+            # resolution so thumbnail() can shrink the copy in place
+            scale = min(max_size[0] / image.width, max_size[1] / image.height)
+            if scale < 1:
+                size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+                thumbnail = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            else:
+                thumbnail = image
+        else:
+            source.draft("RGB", max_size)
+            thumbnail = source.convert("RGB")
 
-        # Generate thumbnail (maintains aspect ratio)
-        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+            # Generate thumbnail (maintains aspect ratio)
+            thumbnail.thumbnail(max_size, Image.Resampling.LANCZOS)
 
         # Save as JPEG
-        image.save(str(thumbnail_path), "JPEG", quality=85, optimize=True)
+        thumbnail.save(str(thumbnail_path), "JPEG", quality=85, optimize=True)
 
         logger.info(f"Generated thumbnail: {thumbnail_path}")
         return str(thumbnail_path)
@@ -1239,26 +1629,33 @@ def generate_video_thumbnail(video_path: str, time_position: float = 1.0, max_si
         return None
 
 
-def _calculate_frame_difference(frame1: np.ndarray, frame2: np.ndarray) -> float:
+def _frame_histogram(frame: np.ndarray) -> np.ndarray:
     """
-    Calculate the difference between two frames using histogram comparison.
+    Normalized hue/saturation histogram of a frame for scene comparison.
 
-    Returns a value between 0 (identical) and 1 (completely different).
-    Uses HSV color space for better scene detection accuracy.
+    The frame is shrunk to at most SCENE_HIST_MAX_SIDE pixels on its longer side
+    first; a colour histogram doesn't need full resolution.
     """
-    try:
-        # Convert to HSV for better color comparison
-        hsv1 = cv2.cvtColor(frame1, cv2.COLOR_RGB2HSV)
-        hsv2 = cv2.cvtColor(frame2, cv2.COLOR_RGB2HSV)
+    height, width = frame.shape[:2]
+    scale = SCENE_HIST_MAX_SIDE / max(height, width)
+    if scale < 1:
+        frame = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
 
-        # Calculate histograms
-        hist1 = cv2.calcHist([hsv1], [0, 1], None, [50, 60], [0, 180, 0, 256])
-        hist2 = cv2.calcHist([hsv2], [0, 1], None, [50, 60], [0, 180, 0, 256])
+    # Convert to HSV for better color comparison
+    hsv = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)
+    hist = cv2.calcHist([hsv], [0, 1], None, [50, 60], [0, 180, 0, 256])
+    cv2.normalize(hist, hist, alpha=0, beta=1, norm_type=cv2.NORM_MINMAX)
+    return hist
 
-        # Normalize histograms
-        cv2.normalize(hist1, hist1, alpha=0, beta=1, norm_type=cv2.NORM_MINMAX)
-        cv2.normalize(hist2, hist2, alpha=0, beta=1, norm_type=cv2.NORM_MINMAX)
 
+def _calculate_frame_difference(hist1: np.ndarray, hist2: np.ndarray) -> float:
+    """
+    Calculate the difference between two frames from their _frame_histogram()s.
+
+    Returns a value between 0 (identical) and 1 (completely different).
+    Uses HSV color space for better scene detection accuracy.
+    """
+    try:
         # Compare histograms (returns value between 0 and 1)
         # 1 = identical, 0 = completely different
         similarity = cv2.compareHist(hist1, hist2, cv2.HISTCMP_CORREL)
@@ -1276,7 +1673,8 @@ def _calculate_frame_difference(frame1: np.ndarray, frame2: np.ndarray) -> float
 def extract_video_frames_with_scene_detection(
     video_path: str,
     scene_threshold: float = 0.3,
-    min_scene_duration_frames: int = 15
+    min_scene_duration_frames: int = 15,
+    cap: Optional[cv2.VideoCapture] = None
 ) -> List[np.ndarray]:
     """
     Extract keyframes from video using smart scene detection.
@@ -1288,14 +1686,21 @@ def extract_video_frames_with_scene_detection(
         video_path: Path to the video file
         scene_threshold: Threshold for scene change detection (0-1, higher = more sensitive)
         min_scene_duration_frames: Minimum frames between scene changes to avoid flickering
+        cap: Optional capture already opened on video_path (rewound, not released)
 
     Returns:
         List of numpy arrays containing only keyframes from unique scenes
     """
+    owns_cap = cap is None
     try:
-        cap = cv2.VideoCapture(video_path)
+        if owns_cap:
+            cap = cv2.VideoCapture(video_path)
+        else:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
         frames = []
         prev_frame = None
+        # Histogram of prev_frame, if it was already computed when that frame was compared
+        prev_hist = None
         frame_count = 0
         last_scene_frame = 0
 
@@ -1306,35 +1711,40 @@ def extract_video_frames_with_scene_detection(
             if not ret:
                 break
 
-            # Convert BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
             # Always add the first frame
             if prev_frame is None:
-                frames.append(frame_rgb)
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
                 prev_frame = frame
                 last_scene_frame = frame_count
-                logger.info(f"Frame {frame_count}: Added first frame")
+                logger.debug("Frame %d: Added first frame", frame_count)
                 frame_count += 1
                 continue
 
             # Check if enough frames have passed since last scene
             frames_since_last_scene = frame_count - last_scene_frame
 
+            hist = None
             if frames_since_last_scene >= min_scene_duration_frames:
-                # Calculate difference from previous frame
-                difference = _calculate_frame_difference(prev_frame, frame)
+                # Calculate difference from previous frame, reusing its histogram
+                # from the last comparison (each frame is histogrammed once)
+                if prev_hist is None:
+                    prev_hist = _frame_histogram(prev_frame)
+                hist = _frame_histogram(frame)
+                difference = _calculate_frame_difference(prev_hist, hist)
 
                 # If difference exceeds threshold, it's a new scene
                 if difference >= scene_threshold:
-                    frames.append(frame_rgb)
+                    # Only kept keyframes are converted to RGB
+                    frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
                     last_scene_frame = frame_count
-                    logger.info(f"Frame {frame_count}: Scene change detected (diff={difference:.3f})")
+                    logger.debug("Frame %d: Scene change detected (diff=%.3f)", frame_count, difference)
 
             prev_frame = frame
+            prev_hist = hist
             frame_count += 1
 
-        cap.release()
+        if owns_cap:
+            cap.release()
         logger.info(f"Smart scene detection complete: extracted {len(frames)} keyframes from {frame_count} total frames")
         return frames
 
@@ -1343,31 +1753,46 @@ def extract_video_frames_with_scene_detection(
         return []
 
 
-def extract_video_frames(video_path: str, frame_interval: int = 30) -> List[np.ndarray]:
+def extract_video_frames(
+    video_path: str,
+    frame_interval: int = 30,
+    cap: Optional[cv2.VideoCapture] = None
+) -> List[np.ndarray]:
     """
     Extract frames from video at specified interval (legacy method).
 
     This method is kept for backward compatibility. For better performance,
     use extract_video_frames_with_scene_detection() instead.
+
+    If cap is given it must be opened on video_path; it is rewound but not released.
     """
+    owns_cap = cap is None
     try:
-        cap = cv2.VideoCapture(video_path)
+        if owns_cap:
+            cap = cv2.VideoCapture(video_path)
+        else:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
         frames = []
         frame_count = 0
 
         while True:
-            ret, frame = cap.read()
-            if not ret:
+            # grab() decodes without converting to BGR; only the sampled
+            # frames pay for retrieve() and the RGB conversion
+            if not cap.grab():
                 break
 
             if frame_count % frame_interval == 0:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
                 # Convert BGR to RGB
                 frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 frames.append(frame_rgb)
 
             frame_count += 1
 
-        cap.release()
+        if owns_cap:
+            cap.release()
         return frames
 
     except Exception as e:
@@ -1375,91 +1800,159 @@ def extract_video_frames(video_path: str, frame_interval: int = 30) -> List[np.n
         return []
 
 
+def _extract_key_frames(video_path: str, frame_interval: int, cap: cv2.VideoCapture) -> List[np.ndarray]:
+    """
+    Extract key frames with smart scene detection on an open capture.
+
+    Falls back to interval-based extraction if scene detection fails or finds nothing.
+    """
+    # Use smart scene detection for better performance
+    try:
+        logger.info(f"Using smart scene detection (threshold={SCENE_THRESHOLD}, min_duration={MIN_SCENE_DURATION})")
+        frames = extract_video_frames_with_scene_detection(
+            video_path,
+            scene_threshold=SCENE_THRESHOLD,
+            min_scene_duration_frames=MIN_SCENE_DURATION,
+            cap=cap
+        )
+
+        # Fallback to interval-based extraction if no frames were extracted
+        if not frames:
+            logger.warning("Scene detection returned no frames, falling back to interval-based extraction")
+            frames = extract_video_frames(video_path, frame_interval, cap=cap)
+
+    except Exception as e:
+        logger.error(f"Scene detection failed: {str(e)}, falling back to interval-based extraction")
+        frames = extract_video_frames(video_path, frame_interval, cap=cap)
+
+    return frames
+
+
+def _read_video_metadata(cap: cv2.VideoCapture) -> Dict:
+    """Read container metadata from an already opened capture."""
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    duration = frame_count / fps if fps > 0 else 0
+
+    return {
+        "duration_seconds": duration,
+        "frame_count": frame_count,
+        "fps": fps,
+        "resolution": f"{width}x{height}"
+    }
+
+
+def _open_video(video_path: str) -> Tuple[cv2.VideoCapture, Dict]:
+    """
+    Open a video once and return the capture (positioned at frame 0) with its metadata.
+
+    The caller owns the capture and must release it. Passing it on to the frame
+    extractors avoids re-initializing the FFmpeg demuxer for every stage.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        metadata = _read_video_metadata(cap)
+    except Exception as e:
+        logger.error(f"Failed to get video metadata: {str(e)}")
+        metadata = {}
+    return cap, metadata
+
+
 def get_video_metadata(video_path: str) -> Dict:
     """Get video metadata using OpenCV."""
     try:
         cap = cv2.VideoCapture(video_path)
-
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        duration = frame_count / fps if fps > 0 else 0
-
+        metadata = _read_video_metadata(cap)
         cap.release()
-
-        return {
-            "duration_seconds": duration,
-            "frame_count": frame_count,
-            "fps": fps,
-            "resolution": f"{width}x{height}"
-        }
+        return metadata
 
     except Exception as e:
         logger.error(f"Failed to get video metadata: {str(e)}")
         return {}
 
 
-def _process_single_frame(idx: int, frame: np.ndarray) -> Optional[Dict]:
-    """Process a single video frame. Helper function for parallel processing."""
+def _process_frame_batch(start_idx: int, frames: List[np.ndarray]) -> List[Dict]:
+    """Caption a batch of consecutive video frames. Helper function for parallel processing."""
     try:
-        # Convert numpy array to PIL Image
-        pil_image = Image.fromarray(frame)
+        # Convert numpy arrays to PIL Images and caption them in one generate() call
+        captions = generate_captions_blip([Image.fromarray(frame) for frame in frames])
 
-        # Generate caption for this frame
-        caption = generate_caption_blip(pil_image)
-
-        return {
-            "frame_index": idx,
-            "description": caption
-        }
+        return [
+            {
+                "frame_index": start_idx + offset,
+                "description": caption
+            }
+            for offset, caption in enumerate(captions)
+        ]
 
     except Exception as e:
-        logger.error(f"Failed to analyze frame {idx}: {str(e)}")
-        return None
+        logger.error(f"Failed to analyze frames {start_idx}-{start_idx + len(frames) - 1}: {str(e)}")
+        return []
 
 
-def analyze_video_scenes(frames: List[np.ndarray]) -> List[Dict]:
+async def analyze_video_scenes_async(frames: List[np.ndarray]) -> List[Dict]:
     """
     Analyze video frames and generate scene descriptions using parallel processing.
 
-    Uses ThreadPoolExecutor to process multiple frames concurrently for better performance.
-    Number of workers is configurable via MAX_VIDEO_WORKERS constant.
+    Frames are captioned in batches of BLIP_BATCH_SIZE on the shared video executor
+    (MAX_VIDEO_WORKERS threads) and gathered in frame order, without blocking the
+    event loop.
     """
-    scene_descriptions = []
-
-    # Use parallel processing if we have multiple frames
-    if len(frames) > 1:
-        logger.info(f"Processing {len(frames)} video frames with {MAX_VIDEO_WORKERS} workers")
-
-        with ThreadPoolExecutor(max_workers=MAX_VIDEO_WORKERS) as executor:
-            # Submit all frames for processing
-            future_to_idx = {
-                executor.submit(_process_single_frame, idx, frame): idx
-                for idx, frame in enumerate(frames)
-            }
+    if not frames:
+        return []
 
-            # Collect results as they complete
-            for future in as_completed(future_to_idx):
-                result = future.result()
-                if result is not None:
-                    scene_descriptions.append(result)
+    logger.info(f"Processing {len(frames)} video frames in batches of {BLIP_BATCH_SIZE} with {MAX_VIDEO_WORKERS} workers")
 
-        # Sort by frame index to maintain order
-        scene_descriptions.sort(key=lambda x: x['frame_index'])
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*[
+        loop.run_in_executor(video_executor, _process_frame_batch, start, frames[start:start + BLIP_BATCH_SIZE])
+        for start in range(0, len(frames), BLIP_BATCH_SIZE)
+    ])
 
-    else:
-        # Single frame - no need for parallel processing
-        result = _process_single_frame(0, frames[0])
-        if result is not None:
-            scene_descriptions.append(result)
+    # gather preserves submission order, so results are already sorted by frame index
+    scene_descriptions = [result for batch in results for result in batch]
 
     logger.info(f"Successfully analyzed {len(scene_descriptions)}/{len(frames)} frames")
     return scene_descriptions
 
 
+def analyze_video_scenes(frames: List[np.ndarray]) -> List[Dict]:
+    """Synchronous wrapper around analyze_video_scenes_async for callers outside the event loop."""
+    return asyncio.run(analyze_video_scenes_async(frames))
+
+
 # ===== DOCUMENT PROCESSING =====
 
+def _pixmap_to_image(pix) -> Image.Image:
+    """
+    Wrap a PyMuPDF pixmap's raw RGB samples in a PIL Image.
+
+    Avoids the tobytes("ppm") encode + decode roundtrip; alpha is dropped and
+    non-RGB colorspaces converted first so the buffer layout is always RGB.
+    """
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.n != 3:
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    return Image.frombuffer("RGB", (pix.width, pix.height), pix.samples, "raw", "RGB", pix.stride, 1)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_mono_font(font_size: int):
+    """Load a monospace font once per size, falling back to PIL's default font."""
+    from PIL import ImageFont
+
+    # Try common monospace fonts
+    for font_path in ("/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", "/System/Library/Fonts/Courier.dfont"):
+        try:
+            return ImageFont.truetype(font_path, font_size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
 def generate_document_thumbnail(document_path: str, max_size: tuple = (800, 800)) -> Optional[str]:
     """
     Generate a thumbnail from a document file (PDF, text, etc.).
@@ -1487,98 +1980,78 @@ def generate_document_thumbnail(document_path: str, max_size: tuple = (800, 800)
         mime_type = original_path.suffix.lower()
 
         if mime_type == '.pdf':
-            # Try to use pdf2image if available
+            # Prefer PyMuPDF: renders in-process, no pdftoppm subprocess
+            if PYMUPDF_AVAILABLE:
+                try:
+                    doc = fitz.open(document_path)
+                    try:
+                        if len(doc) > 0:
+                            page = doc[0]
+                            # Render directly at thumbnail resolution (capped at 2x zoom)
+                            scale = min(2.0, max_size[0] / page.rect.width, max_size[1] / page.rect.height)
+                            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+                            image = _pixmap_to_image(pix)
+                            # No-op unless rounding pushed the render past max_size
+                            image.thumbnail(max_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+                            image.save(str(thumbnail_path), "JPEG", quality=85, optimize=True)
+                            logger.info(f"Generated PDF thumbnail with PyMuPDF: {thumbnail_path}")
+                            return str(thumbnail_path)
+                    finally:
+                        doc.close()
+                except Exception as e:
+                    logger.warning(f"PyMuPDF thumbnail failed, trying pdf2image: {str(e)}")
+            else:
+                logger.warning("PyMuPDF not available, trying pdf2image")
+
             try:
                 from pdf2image import convert_from_path
                 images = convert_from_path(str(document_path), first_page=1, last_page=1)
                 if images:
                     image = images[0]
                     # Generate thumbnail
-                    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+                    image.thumbnail(max_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
                     image.save(str(thumbnail_path), "JPEG", quality=85, optimize=True)
                     logger.info(f"Generated PDF thumbnail: {thumbnail_path}")
                     return str(thumbnail_path)
             except ImportError:
-                logger.warning("pdf2image not available, trying PyMuPDF")
-                try:
-                    import fitz  # PyMuPDF
-                    doc = fitz.open(document_path)
-                    if len(doc) > 0:
-                        page = doc[0]
-                        # Render page to pixmap
-                        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for quality
-                        # Convert to PIL Image
-                        img_data = pix.tobytes("ppm")
-                        image = Image.frombytes("RGB", [pix.width, pix.height], img_data)
-                        # Generate thumbnail
-                        image.thumbnail(max_size, Image.Resampling.LANCZOS)
-                        image.save(str(thumbnail_path), "JPEG", quality=85, optimize=True)
-                        doc.close()
-                        logger.info(f"Generated PDF thumbnail with PyMuPDF: {thumbnail_path}")
-                        return str(thumbnail_path)
-                except ImportError:
-                    logger.warning("PyMuPDF not available, cannot generate PDF thumbnail")
-                    return None
+                logger.warning("pdf2image not available, cannot generate PDF thumbnail")
+                return None
 
         elif mime_type in ['.txt', '.csv', '.log', '.md']:
             # For text files, create a text preview image with actual content
             with open(document_path, 'r', encoding='utf-8', errors='ignore') as f:
                 text_content = f.read(1000)  # First 1000 chars
 
-            from PIL import ImageDraw, ImageFont
+            from PIL import ImageDraw
 
             # Create image with paper-like background
             img = Image.new('RGB', (800, 1000), color='#f5f5f0')
             draw = ImageDraw.Draw(img)
 
-            # Try to use a monospace font, fallback to default
-            try:
-                # Try common monospace fonts
-                font_size = 12
-                font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", font_size)
-            except:
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Courier.dfont", font_size)
-                except:
-                    font = ImageFont.load_default()
+            font = _get_mono_font(12)
 
             # Add padding and format text
             padding = 20
             max_width = 800 - (2 * padding)
-            y_position = padding
 
-            # Split text into lines and wrap
+            # Wrap using the measured glyph width of the font (monospace, so "M" is representative)
+            avg_char_width = font.getlength("M") or 7
+            wrap_width = max(1, int(max_width / avg_char_width))
             lines = []
             for line in text_content.split('\n'):
-                if not line:
-                    lines.append('')
-                    continue
-                # Simple word wrapping
-                words = line.split(' ')
-                current_line = ''
-                for word in words:
-                    test_line = current_line + (' ' if current_line else '') + word
-                    # Approximate character width (more accurate would use textbbox)
-                    if len(test_line) * 7 < max_width:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-                if current_line:
-                    lines.append(current_line)
-
-            # Draw lines (max 60 lines to fit in image)
-            for line in lines[:60]:
-                draw.text((padding, y_position), line, fill='#333333', font=font)
-                y_position += 16
+                lines.extend(textwrap.wrap(line, width=wrap_width) or [''])
+
+            # Draw lines in a single call (max 60 lines to fit in image)
+            wrapped = '\n'.join(lines[:60])
+            draw.multiline_text((padding, padding), wrapped, fill='#333333', font=font, spacing=4)
 
             # Add truncation indicator if needed
             if len(lines) > 60 or len(text_content) >= 1000:
-                draw.text((padding, y_position + 10), "...", fill='#666666', font=font)
+                text_bottom = draw.multiline_textbbox((padding, padding), wrapped, font=font, spacing=4)[3]
+                draw.text((padding, text_bottom + 10), "...", fill='#666666', font=font)
 
             # Generate thumbnail
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            img.thumbnail(max_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
             img.save(str(thumbnail_path), "JPEG", quality=85)
             logger.info(f"Generated text document thumbnail: {thumbnail_path}")
             return str(thumbnail_path)
@@ -1594,10 +2067,14 @@ def generate_document_thumbnail(document_path: str, max_size: tuple = (800, 800)
 
 # ===== OFFICE DOCUMENT EXTRACTION =====
 
+# RTF control words (\par, \f0, \fs24 ...) and group braces, stripped from .rtf text
+_RTF_CONTROL_WORD = re.compile(r'\\[a-z]+\d*\s?')
+_RTF_BRACES = str.maketrans('', '', '{}')
+
+
 def extract_word_document(document_path: str) -> str:
     """Extract text from Word documents (.docx, .doc, .odt, .rtf)."""
     try:
-        from pathlib import Path
         doc_path = Path(document_path)
         extension = doc_path.suffix.lower()
 
@@ -1633,11 +2110,9 @@ def extract_word_document(document_path: str) -> str:
             try:
                 with open(document_path, 'r', encoding='utf-8', errors='ignore') as f:
                     content = f.read()
-                # Remove RTF control codes (basic cleanup)
-                import re
-                text = re.sub(r'\\[a-z]+\d*\s?', '', content)
-                text = re.sub(r'[{}]', '', text)
-                return text.strip()
+                # Remove RTF control codes (basic cleanup); braces are single
+                # characters, so str.translate drops them without a regex pass
+                return _RTF_CONTROL_WORD.sub('', content).translate(_RTF_BRACES).strip()
             except Exception as e:
                 logger.error(f"Failed to extract RTF document: {str(e)}")
                 return ""
@@ -1652,7 +2127,6 @@ def extract_word_document(document_path: str) -> str:
 def extract_spreadsheet(document_path: str) -> str:
     """Extract text and data from spreadsheets (.xlsx, .xls, .ods, .csv)."""
     try:
-        from pathlib import Path
         doc_path = Path(document_path)
         extension = doc_path.suffix.lower()
 
@@ -1660,27 +2134,27 @@ def extract_spreadsheet(document_path: str) -> str:
             # Handle Excel files
             try:
                 from openpyxl import load_workbook
-                wb = load_workbook(document_path, read_only=True, data_only=True)
+                wb = load_workbook(document_path, read_only=True, data_only=True, keep_links=False)
                 full_text = []
 
-                for sheet_name in wb.sheetnames:
+                for sheet_name in wb.sheetnames[:SPREADSHEET_MAX_SHEETS]:
                     sheet = wb[sheet_name]
                     full_text.append(f"=== Sheet: {sheet_name} ===")
 
+                    # Single pass over the header row plus the first 20 data rows
+                    rows_iter = sheet.iter_rows(min_row=1, max_row=21, values_only=True)
+
                     # Extract headers (first row)
-                    headers = []
-                    for cell in sheet[1]:
-                        if cell.value:
-                            headers.append(str(cell.value))
+                    headers = [str(value) for value in next(rows_iter, ()) if value]
 
                     if headers:
                         full_text.append("Headers: " + ", ".join(headers))
 
                     # Extract data (sample first 20 rows to avoid huge text dumps)
-                    for idx, row in enumerate(sheet.iter_rows(min_row=2, max_row=21, values_only=True), 2):
-                        row_values = [str(cell) for cell in row if cell is not None]
-                        if row_values:
-                            full_text.append(f"Row {idx}: " + " | ".join(row_values))
+                    for idx, row in enumerate(rows_iter, 2):
+                        line = " | ".join([str(cell) for cell in row if cell is not None])
+                        if line:
+                            full_text.append(f"Row {idx}: {line}")
 
                 wb.close()
                 return '\n'.join(full_text)
@@ -1699,7 +2173,7 @@ def extract_spreadsheet(document_path: str) -> str:
                 full_text = []
 
                 tables = spreadsheet.getElementsByType(Table)
-                for table in tables[:3]:  # Limit to first 3 sheets
+                for table in tables[:SPREADSHEET_MAX_SHEETS]:
                     table_name = table.getAttribute("name") or "Sheet"
                     full_text.append(f"=== Sheet: {table_name} ===")
 
@@ -1719,9 +2193,10 @@ def extract_spreadsheet(document_path: str) -> str:
             # Handle CSV files
             try:
                 import csv
-                with open(document_path, 'r', encoding='utf-8', errors='ignore') as f:
+                from itertools import islice
+                with open(document_path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
                     reader = csv.reader(f)
-                    rows = list(reader)[:21]  # First 20 rows
+                    rows = islice(reader, 21)  # Header + first 20 rows, stops reading there
                     full_text = [" | ".join(row) for row in rows]
                     return '\n'.join(full_text)
             except Exception as e:
@@ -1738,7 +2213,6 @@ def extract_spreadsheet(document_path: str) -> str:
 def extract_presentation(document_path: str) -> str:
     """Extract text from presentations (.pptx, .ppt, .odp)."""
     try:
-        from pathlib import Path
         doc_path = Path(document_path)
         extension = doc_path.suffix.lower()
 
@@ -1753,12 +2227,17 @@ def extract_presentation(document_path: str) -> str:
                     full_text.append(f"=== Slide {slide_num} ===")
 
                     for shape in slide.shapes:
-                        if hasattr(shape, "text") and shape.text.strip():
-                            full_text.append(shape.text)
-
-                    # Extract notes
-                    if slide.has_notes_slide and slide.notes_slide.notes_text_frame.text.strip():
-                        full_text.append(f"Notes: {slide.notes_slide.notes_text_frame.text}")
+                        # .text re-walks the shape's XML on every access, so read it once
+                        shape_text = getattr(shape, "text", None)
+                        if shape_text and shape_text.strip():
+                            full_text.append(shape_text)
+
+                    # Extract notes (has_notes_slide avoids creating an empty notes part)
+                    if slide.has_notes_slide:
+                        notes_frame = slide.notes_slide.notes_text_frame
+                        notes = notes_frame.text if notes_frame is not None else ""
+                        if notes and notes.strip():
+                            full_text.append(f"Notes: {notes}")
 
                 return '\n'.join(full_text)
             except Exception as e:
@@ -1802,7 +2281,6 @@ def extract_email(email_path: str) -> dict:
         dict with sender, recipients, subject, date, body, and attachment count
     """
     try:
-        from pathlib import Path
         import email
         from email import policy
         from email.parser import BytesParser
@@ -1851,19 +2329,31 @@ def extract_email(email_path: str) -> dict:
                 # Extract body
                 body_parts = []
                 if msg.is_multipart():
+                    body_size = 0
                     for part in msg.walk():
+                        # multipart/* containers carry no content or disposition of their own.
+                        # message/rfc822 also reports is_multipart(), but a forwarded email
+                        # can itself be an attachment, so only skip on the content type.
                         content_type = part.get_content_type()
-                        if content_type == 'text/plain':
-                            try:
-                                body_parts.append(part.get_content())
-                            except:
-                                pass
-                        elif content_type == 'text/html':
-                            result['has_html'] = True
+                        if content_type.startswith('multipart/'):
+                            continue
 
                         # Count attachments
                         if part.get_content_disposition() == 'attachment':
                             result['attachment_count'] += 1
+
+                        if not content_type.startswith('text/'):
+                            continue
+                        if content_type == 'text/html':
+                            result['has_html'] = True
+                        elif content_type == 'text/plain' and body_size < EMAIL_BODY_MAX_CHARS:
+                            # Keep walking for attachment counts, but stop decoding once the body budget is spent
+                            try:
+                                content = part.get_content()
+                                body_parts.append(content)
+                                body_size += len(content)
+                            except:
+                                pass
                 else:
                     if msg.get_content_type() == 'text/plain':
                         body_parts.append(msg.get_content())
@@ -1932,6 +2422,16 @@ def extract_email(email_path: str) -> dict:
         }
 
 
+def _member_extension(name: str) -> str:
+    """
+    Lowercased extension of an archive member name, same result as
+    Path(name).suffix.lower() but with plain string ops (no PurePath per member).
+    """
+    name = name[name.rfind('/') + 1:]
+    dot = name.rfind('.')
+    return name[dot:].lower() if 0 < dot < len(name) - 1 else ''
+
+
 def extract_archive_metadata(archive_path: str) -> dict:
     """
     Extract metadata from archive files (.zip, .rar, .7z, .tar, .gz).
@@ -1941,7 +2441,6 @@ def extract_archive_metadata(archive_path: str) -> dict:
         dict with file_count, total_size, file_types, and file_list
     """
     try:
-        from pathlib import Path
         import zipfile
         import tarfile
 
@@ -1959,14 +2458,13 @@ def extract_archive_metadata(archive_path: str) -> dict:
             # Handle ZIP files
             try:
                 with zipfile.ZipFile(archive_path, 'r') as zf:
-                    file_list = zf.namelist()
-                    result['file_count'] = len(file_list)
-
-                    # Analyze file types and sizes
+                    # Analyze file types and sizes in a single pass over the central directory
                     for file_info in zf.infolist():
                         if not file_info.is_dir():
+                            result['file_count'] += 1
+
                             # Get file extension
-                            file_ext = Path(file_info.filename).suffix.lower()
+                            file_ext = _member_extension(file_info.filename)
                             if file_ext:
                                 result['file_types'][file_ext] = result['file_types'].get(file_ext, 0) + 1
 
@@ -1989,16 +2487,20 @@ def extract_archive_metadata(archive_path: str) -> dict:
         elif extension in ['.tar', '.gz', '.tgz']:
             # Handle TAR files (including .tar.gz)
             try:
-                mode = 'r:gz' if extension in ['.gz', '.tgz'] or archive_path.endswith('.tar.gz') else 'r'
-                with tarfile.open(archive_path, mode) as tf:
-                    members = tf.getmembers()
-                    result['file_count'] = len([m for m in members if m.isfile()])
+                # Members are read one header at a time instead of building the full
+                # member list up front. Random-access mode ('r:*' auto-detects compression)
+                # seeks over member data, so an uncompressed tar is walked header to header
+                # without reading its payload; compressed tars are decompressed once either way
+                with tarfile.open(archive_path, 'r:*') as tf:
+                    for member in tf:
+                        # TarFile still records every member; drop them as we go
+                        tf.members = []
 
-                    # Analyze file types and sizes
-                    for member in members:
                         if member.isfile():
+                            result['file_count'] += 1
+
                             # Get file extension
-                            file_ext = Path(member.name).suffix.lower()
+                            file_ext = _member_extension(member.name)
                             if file_ext:
                                 result['file_types'][file_ext] = result['file_types'].get(file_ext, 0) + 1
 
@@ -2024,21 +2526,26 @@ def extract_archive_metadata(archive_path: str) -> dict:
                 import py7zr
 
                 with py7zr.SevenZipFile(archive_path, 'r') as szf:
-                    file_list = szf.getnames()
-                    result['file_count'] = len(file_list)
-
-                    # Analyze file types
-                    for filename in file_list:
-                        file_ext = Path(filename).suffix.lower()
-                        if file_ext:
-                            result['file_types'][file_ext] = result['file_types'].get(file_ext, 0) + 1
-
-                        # Add to file list (limit to first 50 files)
-                        if len(result['file_list']) < 50:
-                            result['file_list'].append({
-                                'name': filename,
-                                'size': 0  # py7zr doesn't provide easy size access without extraction
-                            })
+                    # Analyze file types and sizes in a single pass over the header entries
+                    for file_info in szf.list():
+                        if not file_info.is_directory:
+                            result['file_count'] += 1
+
+                            # Get file extension
+                            file_ext = _member_extension(file_info.filename)
+                            if file_ext:
+                                result['file_types'][file_ext] = result['file_types'].get(file_ext, 0) + 1
+
+                            # Add to total size (uncompressed size is read from the header, no extraction)
+                            file_size = file_info.uncompressed or 0
+                            result['total_size'] += file_size
+
+                            # Add to file list (limit to first 50 files)
+                            if len(result['file_list']) < 50:
+                                result['file_list'].append({
+                                    'name': file_info.filename,
+                                    'size': file_size
+                                })
 
                 return result
 
@@ -2052,14 +2559,13 @@ def extract_archive_metadata(archive_path: str) -> dict:
                 import rarfile
 
                 with rarfile.RarFile(archive_path, 'r') as rf:
-                    file_list = rf.namelist()
-                    result['file_count'] = len(file_list)
-
-                    # Analyze file types and sizes
+                    # Analyze file types and sizes in a single pass over the entries
                     for file_info in rf.infolist():
                         if not file_info.isdir():
+                            result['file_count'] += 1
+
                             # Get file extension
-                            file_ext = Path(file_info.filename).suffix.lower()
+                            file_ext = _member_extension(file_info.filename)
                             if file_ext:
                                 result['file_types'][file_ext] = result['file_types'].get(file_ext, 0) + 1
 
@@ -2091,6 +2597,31 @@ def extract_archive_metadata(archive_path: str) -> dict:
         }
 
 
+COMMENT_LINE_PREFIXES = ('#', '//', '/*', '*', '<!--', '--', '%', ';')
+
+
+def _classify_lines(content: str) -> Tuple[int, int, int, int]:
+    """
+    Classify lines of source text with simple heuristics.
+
+    Returns:
+        Tuple of (total, code, comment, blank) line counts
+    """
+    lines = content.split('\n')
+    code = comment = blank = 0
+
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            blank += 1
+        elif stripped.startswith(COMMENT_LINE_PREFIXES):
+            comment += 1
+        else:
+            code += 1
+
+    return len(lines), code, comment, blank
+
+
 def analyze_code_file(code_path: str) -> dict:
     """
     Analyze code files to extract metadata (language, line count, etc.).
@@ -2099,7 +2630,6 @@ def analyze_code_file(code_path: str) -> dict:
         dict with language, line_count, code_lines, comment_lines, blank_lines
     """
     try:
-        from pathlib import Path
         from pygments.lexers import get_lexer_for_filename, guess_lexer
         from pygments.util import ClassNotFound
         import chardet
@@ -2120,23 +2650,26 @@ def analyze_code_file(code_path: str) -> dict:
         # Get file size
         result['file_size'] = code_file_path.stat().st_size
 
-        # Detect encoding
+        # Read the file once; almost all source code is valid UTF-8 (or plain ASCII),
+        # so chardet only runs, on a bounded sample, when strict UTF-8 decoding fails
+        with open(code_path, 'rb') as f:
+            raw = f.read()
         try:
-            with open(code_path, 'rb') as f:
-                raw_data = f.read()
-                detected = chardet.detect(raw_data)
-                result['encoding'] = detected.get('encoding', 'utf-8') or 'utf-8'
-        except:
-            result['encoding'] = 'utf-8'
-
-        # Read file content
-        try:
-            with open(code_path, 'r', encoding=result['encoding']) as f:
-                content = f.read()
-        except:
-            # Fallback to utf-8 with errors ignored
-            with open(code_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            content = raw.decode('utf-8')
+            result['encoding'] = 'ascii' if raw.isascii() else 'utf-8'
+        except UnicodeDecodeError:
+            try:
+                detected = chardet.detect(raw[:ENCODING_SNIFF_BYTES])
+                if (detected.get('confidence') or 0) >= 0.5:
+                    result['encoding'] = detected.get('encoding') or 'utf-8'
+            except:
+                result['encoding'] = 'utf-8'
+
+            try:
+                content = raw.decode(result['encoding'], errors='ignore')
+            except LookupError:
+                # Codec name reported by chardet is unknown to Python, fall back to utf-8
+                content = raw.decode('utf-8', errors='ignore')
 
         # Detect language using Pygments
         try:
@@ -2151,18 +2684,12 @@ def analyze_code_file(code_path: str) -> dict:
                 result['language'] = 'text'
 
         # Analyze lines
-        lines = content.split('\n')
-        result['line_count'] = len(lines)
-
-        # Simple heuristics for code/comment/blank lines
-        for line in lines:
-            stripped = line.strip()
-            if not stripped:
-                result['blank_lines'] += 1
-            elif stripped.startswith(('#', '//', '/*', '*', '<!--', '--', '%', ';')):
-                result['comment_lines'] += 1
-            else:
-                result['code_lines'] += 1
+        (
+            result['line_count'],
+            result['code_lines'],
+            result['comment_lines'],
+            result['blank_lines'],
+        ) = _classify_lines(content)
 
         # Extract text content for searchability (limit to 50KB for database storage)
         result['extracted_text'] = content[:50000] if len(content) > 50000 else content
@@ -2184,11 +2711,28 @@ def analyze_code_file(code_path: str) -> dict:
 
 
 def get_paddle_ocr():
-    """Lazily initialize PaddleOCR (it's heavy to load)."""
+    """
+    Lazily initialize PaddleOCR (it's heavy to load).
+
+    Normally already warmed up by the startup hook; the lock stops a request that
+    arrives mid-warm-up from building a second instance.
+    """
     global PADDLE_OCR
-    if PADDLE_OCR is None and PADDLEOCR_AVAILABLE:
+    if PADDLE_OCR is not None or not PADDLEOCR_AVAILABLE:
+        return PADDLE_OCR
+
+    with paddle_ocr_lock:
+        if PADDLE_OCR is not None:
+            return PADDLE_OCR
         logger.info("Initializing PaddleOCR...")
-        PADDLE_OCR = PaddleOCR(use_angle_cls=True, lang='en', show_log=False)
+        PADDLE_OCR = PaddleOCR(
+            use_angle_cls=True,
+            lang='en',
+            show_log=False,
+            # Recognize/classify more detected text lines per forward pass (Paddle default: 6)
+            rec_batch_num=PADDLE_OCR_BATCH_SIZE,
+            cls_batch_num=PADDLE_OCR_BATCH_SIZE
+        )
         logger.info("PaddleOCR initialized")
     return PADDLE_OCR
 
@@ -2199,11 +2743,13 @@ def perform_ocr_with_paddle(image) -> str:
     if ocr is None:
         return ""
 
-    # Convert PIL Image to numpy array for PaddleOCR
-    img_array = np.array(image)
+    # Convert PIL Image to numpy array for PaddleOCR. asarray skips the extra
+    # writable copy np.array makes; PaddleOCR copies the image before modifying it
+    img_array = np.asarray(image)
 
     # PaddleOCR returns list of results: [[box, (text, confidence)], ...]
-    result = ocr.ocr(img_array, cls=True)
+    with paddle_ocr_run_lock:
+        result = ocr.ocr(img_array, cls=True)
 
     if not result or not result[0]:
         return ""
@@ -2225,6 +2771,150 @@ def perform_ocr_with_tesseract(image) -> str:
     return pytesseract.image_to_string(image)
 
 
+def _run_tesseract_single_threaded(input_path: str) -> str:
+    """
+    Run the tesseract binary on an image (or image list) file and return its text.
+
+    Used by the parallel PDF path: several tesseract processes already run at once
+    (OCR_WORKERS), and OpenMP threading inside each one only oversubscribes the
+    cores, so OMP_THREAD_LIMIT=1 is set for the subprocess alone. This process's
+    own OpenMP runtimes (Paddle, scikit-learn, numba) keep their thread pools.
+    """
+    env = dict(os.environ, OMP_THREAD_LIMIT="1")
+    completed = subprocess.run(
+        [pytesseract.pytesseract.tesseract_cmd, input_path, "stdout"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"tesseract failed: {completed.stderr.decode('utf-8', errors='ignore').strip()}")
+    return completed.stdout.decode('utf-8', errors='ignore')
+
+
+def perform_ocr_with_tesseract_files(image_paths: List[str]) -> List[str]:
+    """
+    OCR several page images with a single Tesseract process (one text per path).
+
+    Tesseract reads a .txt input as a list of image files and ends each page's
+    text with a form feed, so the model is loaded once for the whole batch.
+    """
+    if not TESSERACT_AVAILABLE:
+        return [""] * len(image_paths)
+
+    list_path = image_paths[0] + ".list.txt"
+    with open(list_path, 'w') as f:
+        f.write("\n".join(image_paths) + "\n")
+    try:
+        texts = _run_tesseract_single_threaded(list_path).split("\x0c")
+    finally:
+        os.remove(list_path)
+
+    if len(texts) < len(image_paths):
+        # Page boundaries lost; OCR the pages one by one instead
+        logger.warning("Tesseract batch output did not split into pages, retrying per page")
+        return [_run_tesseract_single_threaded(path) for path in image_paths]
+    return texts[:len(image_paths)]
+
+
+def _ocr_pdf_pages_with_tesseract(document_path: str, native_texts: Optional[Dict[int, str]] = None) -> Dict[int, str]:
+    """
+    OCR every PDF page with Tesseract, TESSERACT_PAGES_PER_CALL pages per process
+    and OCR_WORKERS processes at a time.
+
+    Pages are rendered on this thread and written to a temporary directory as
+    uncompressed PPM; each batch's files are removed once it has been OCR'd, and
+    at most OCR_WORKERS + 1 batches are on disk at once. native_texts is passed
+    through to _render_pdf_pages().
+    """
+    page_texts = {}
+
+    def _ocr_batch(batch: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+        try:
+            texts = perform_ocr_with_tesseract_files([path for _, path in batch])
+            return [(page_num, text) for (page_num, _), text in zip(batch, texts)]
+        finally:
+            for _, path in batch:
+                os.remove(path)
+
+    with tempfile.TemporaryDirectory(prefix="ocr-") as tmp_dir:
+        with ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr") as executor:
+            pending = set()
+            batch = []
+
+            def _submit():
+                if len(pending) > OCR_WORKERS:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        page_texts.update(future.result())
+                pending.add(executor.submit(_ocr_batch, list(batch)))
+                batch.clear()
+
+            for page_num, image in _render_pdf_pages(document_path, native_texts):
+                path = os.path.join(tmp_dir, f"page-{page_num:05d}.ppm")
+                image.save(path)
+                batch.append((page_num, path))
+                if len(batch) >= TESSERACT_PAGES_PER_CALL:
+                    _submit()
+            if batch:
+                _submit()
+
+            for future in as_completed(pending):
+                page_texts.update(future.result())
+
+    return page_texts
+
+
+def _render_pdf_pages(
+    document_path: str,
+    native_texts: Optional[Dict[int, str]] = None
+) -> Iterator[Tuple[int, Image.Image]]:
+    """
+    Yield (page_number, image) for each PDF page, rendered for OCR.
+
+    Uses PyMuPDF (in-process, one page at a time) and falls back to pdf2image.
+    If native_texts is given (PyMuPDF only), pages that already carry a text layer
+    of at least PDF_PAGE_TEXT_MIN_CHARS are not rendered; their text is stored in
+    native_texts under the page number instead.
+    """
+    if PYMUPDF_AVAILABLE:
+        doc = fitz.open(document_path)
+        try:
+            logger.info(f"Rendering {len(doc)} PDF pages with PyMuPDF for OCR: {document_path}")
+            for page_num, page in enumerate(doc, 1):
+                if native_texts is not None:
+                    page_text = page.get_text().strip()
+                    if len(page_text) >= PDF_PAGE_TEXT_MIN_CHARS:
+                        native_texts[page_num] = page_text
+                        continue
+                # Render page to pixmap with higher resolution for better OCR
+                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2), alpha=False)  # 2x zoom
+                image = _pixmap_to_image(pix)
+                # Release the pixmap before handing the page off
+                pix = None
+                yield page_num, image
+        finally:
+            doc.close()
+        return
+
+    try:
+        from pdf2image import convert_from_path, pdfinfo_from_path
+    except ImportError:
+        logger.error("Neither PyMuPDF nor pdf2image available for PDF OCR")
+        return
+
+    # convert_from_path renders every requested page up front, so convert in
+    # chunks to keep at most PDF_RENDER_CHUNK_PAGES rendered pages alive
+    page_count = pdfinfo_from_path(document_path)["Pages"]
+    logger.info(f"Converting {page_count} PDF pages to images for OCR: {document_path}")
+    for first_page in range(1, page_count + 1, PDF_RENDER_CHUNK_PAGES):
+        last_page = min(first_page + PDF_RENDER_CHUNK_PAGES - 1, page_count)
+        images = convert_from_path(document_path, first_page=first_page, last_page=last_page)
+        yield from enumerate(images, first_page)
+        images = None
+
+
 def perform_ocr(document_path: str, engine: str = "auto") -> str:
     """
     Perform OCR on document (PDF or image).
@@ -2274,52 +2964,46 @@ def perform_ocr(document_path: str, engine: str = "auto") -> str:
 
         # Handle PDF files by converting to images first
         if mime_type == '.pdf':
-            all_text = []
-
-            # Try pdf2image first
-            try:
-                from pdf2image import convert_from_path
-                logger.info(f"Converting PDF to images for OCR: {document_path}")
-                images = convert_from_path(str(document_path))
-
-                for page_num, image in enumerate(images, 1):
-                    logger.info(f"Performing OCR on page {page_num}/{len(images)} with {engine_name}")
-                    page_text = ocr_func(image)
-                    if page_text.strip():
-                        all_text.append(f"--- Page {page_num} ---\n{page_text.strip()}")
-
-                result = "\n\n".join(all_text)
-                logger.info(f"OCR completed with {engine_name}: extracted {len(result)} characters from {len(images)} pages")
-                return result
-
-            except ImportError:
-                logger.warning("pdf2image not available, trying PyMuPDF for OCR")
-                try:
-                    import fitz  # PyMuPDF
-                    doc = fitz.open(document_path)
-                    logger.info(f"Converting PDF to images using PyMuPDF for OCR: {document_path}")
-
-                    for page_num in range(len(doc)):
-                        page = doc[page_num]
-                        # Render page to pixmap with higher resolution for better OCR
-                        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom
-                        # Convert to PIL Image
-                        img_data = pix.tobytes("ppm")
-                        image = Image.frombytes("RGB", [pix.width, pix.height], img_data)
-
-                        logger.info(f"Performing OCR on page {page_num + 1}/{len(doc)} with {engine_name}")
-                        page_text = ocr_func(image)
-                        if page_text.strip():
-                            all_text.append(f"--- Page {page_num + 1} ---\n{page_text.strip()}")
-
-                    doc.close()
-                    result = "\n\n".join(all_text)
-                    logger.info(f"OCR completed with {engine_name}: extracted {len(result)} characters from {len(doc)} pages")
-                    return result
+            # Pages with their own text layer (mixed scanned/born-digital PDFs) are
+            # taken as-is instead of being rasterized and OCR'd
+            native_texts = {}
+            if ocr_func is perform_ocr_with_tesseract:
+                # Tesseract runs out of process: batch pages per process and run
+                # several processes concurrently
+                workers = OCR_WORKERS
+                page_texts = _ocr_pdf_pages_with_tesseract(str(document_path), native_texts)
+            else:
+                # PaddleOCR's predictor is not safe to share across threads; pages are
+                # rendered on this thread while the single worker OCRs the previous one
+                workers = 1
+                page_texts = {}
+                with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr") as executor:
+                    pending = {}
+                    for page_num, image in _render_pdf_pages(str(document_path), native_texts):
+                        if len(pending) >= 2:
+                            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                page_texts[pending.pop(future)] = future.result()
+                        pending[executor.submit(ocr_func, image)] = page_num
+
+                    for future in as_completed(pending):
+                        page_texts[pending[future]] = future.result()
+
+            ocr_page_count = len(page_texts)
+            page_texts.update(native_texts)
 
-                except ImportError:
-                    logger.error("Neither pdf2image nor PyMuPDF available for PDF OCR")
-                    return ""
+            all_text = []
+            for page_num in sorted(page_texts):
+                page_text = page_texts[page_num].strip()
+                if page_text:
+                    all_text.append(f"--- Page {page_num} ---\n{page_text}")
+
+            result = "\n\n".join(all_text)
+            logger.info(
+                f"OCR completed with {engine_name}: extracted {len(result)} characters from {ocr_page_count} OCR'd "
+                f"and {len(native_texts)} text-layer pages using {workers} workers"
+            )
+            return result
 
         # Handle regular image files
         else:
@@ -2334,17 +3018,92 @@ def perform_ocr(document_path: str, engine: str = "auto") -> str:
         return ""
 
 
+KEYWORD_STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'that', 'this', 'by', 'from', 'as', 'be', 'or', 'and'
+})
+
+
+# Keywords are counted over at most this many leading characters; the top-N
+# frequency ranking settles well before that on long documents
+KEYWORD_TEXT_MAX_CHARS = 10000
+
+
 def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     """Extract keywords from text."""
-    words = text.lower().split()
-    stop_words = {'a', 'an', 'the', 'is', 'are', 'was', 'were', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'that', 'this', 'by', 'from', 'as', 'be', 'or', 'and'}
-    keywords = [w.strip('.,!?;:') for w in words if w not in stop_words and len(w) > 3]
+    text = text[:KEYWORD_TEXT_MAX_CHARS]
+    keywords = [w.strip('.,!?;:') for w in text.lower().split() if len(w) > 3 and w not in KEYWORD_STOP_WORDS]
     # Count frequency and return top keywords
-    from collections import Counter
     keyword_counts = Counter(keywords)
     return [word for word, count in keyword_counts.most_common(max_keywords)]
 
 
+def _get_ollama_cache():
+    """Open the Ollama response cache on first use; returns None if disabled or unavailable."""
+    global ollama_cache_conn
+
+    if ollama_cache_conn is None:
+        if not OLLAMA_CACHE_PATH:
+            ollama_cache_conn = False
+        else:
+            try:
+                Path(OLLAMA_CACHE_PATH).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(OLLAMA_CACHE_PATH, timeout=5, check_same_thread=False)
+                conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)")
+                conn.commit()
+                ollama_cache_conn = conn
+                logger.info(f"Ollama response cache: {OLLAMA_CACHE_PATH}")
+            except Exception as e:
+                logger.warning(f"Ollama response cache disabled: {str(e)}")
+                ollama_cache_conn = False
+
+    return ollama_cache_conn or None
+
+
+def ollama_generate_cached(model: str, prompt: str, json_format: bool = False) -> str:
+    """
+    Run a text-only Ollama generation, reusing the stored response for an identical model + prompt.
+
+    With json_format, Ollama constrains decoding to a single valid JSON value, so the
+    response parses directly instead of having to be dug out of surrounding prose.
+
+    Only successful, non-empty responses are cached, so errors (Ollama down, model
+    missing) propagate to the caller and are retried on the next request.
+    """
+    cache_prompt = f"json\0{prompt}" if json_format else prompt
+    key = hashlib.sha1(f"{model}\0{cache_prompt}".encode('utf-8')).hexdigest()
+
+    with ollama_cache_lock:
+        conn = _get_ollama_cache()
+        if conn is not None:
+            try:
+                row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    return row[0]
+            except sqlite3.Error as e:
+                logger.warning(f"Ollama cache lookup failed: {str(e)}")
+
+    response = ollama_client.generate(
+        model=model,
+        prompt=prompt,
+        stream=False,
+        format='json' if json_format else ''
+    )
+    result_text = response.get('response', '')
+
+    if result_text:
+        with ollama_cache_lock:
+            conn = _get_ollama_cache()
+            if conn is not None:
+                try:
+                    conn.execute("INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)", (key, result_text))
+                    conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Ollama cache write failed: {str(e)}")
+
+    return result_text
+
+
 def classify_document_with_ollama(text: str, filename: str, ollama_model: str = "llama3.2") -> dict:
     """
     Classify document type using Ollama LLM.
@@ -2388,13 +3147,7 @@ Classify this document into ONE of these categories:
 
 Respond in JSON format only: {{"document_type": "category", "confidence": 0.95}}"""
 
-        response = ollama_client.generate(
-            model=ollama_model,
-            prompt=prompt,
-            stream=False
-        )
-
-        result_text = response.get('response', '')
+        result_text = ollama_generate_cached(ollama_model, prompt, json_format=True)
 
         # Parse JSON response using robust extraction
         result = extract_json_from_response(result_text)
@@ -2455,13 +3208,7 @@ Respond in JSON format with actual values found (use null if not found):
   "reference": "REF-123"
 }}"""
 
-        response = ollama_client.generate(
-            model=ollama_model,
-            prompt=prompt,
-            stream=False
-        )
-
-        result_text = response.get('response', '')
+        result_text = ollama_generate_cached(ollama_model, prompt, json_format=True)
 
         # Parse JSON response using robust extraction
         entities = extract_json_from_response(result_text)
@@ -2512,28 +3259,11 @@ Write a clear, actionable summary that highlights:
 
 Summary (2-3 sentences):"""
 
-        response = ollama_client.generate(
-            model=ollama_model,
-            prompt=prompt,
-            stream=False
-        )
-
-        summary = response.get('response', '').strip()
+        summary = ollama_generate_cached(ollama_model, prompt).strip()
 
         # Fallback if summary is too short or empty
         if len(summary) < 20:
-            # Create basic summary from entities
-            if doc_type == 'invoice' and entities:
-                doc_num = entities.get('document_number', 'N/A')
-                from_party = entities.get('parties', ['Unknown'])[0] if entities.get('parties') else 'Unknown'
-                to_party = entities.get('parties', ['Unknown'])[1] if entities.get('parties', [None, None])[1] else 'Unknown'
-                amount = entities.get('amounts', [{}])[0] if entities.get('amounts') else {}
-                amount_str = f"${amount.get('value', 0)} {amount.get('currency', 'USD')}" if amount else "N/A"
-                dates = entities.get('dates', [])
-                due_date = dates[0] if dates else 'N/A'
-                return f"Invoice {doc_num} from {from_party} to {to_party} for {amount_str}, due {due_date}"
-            else:
-                return text[:200] + "..." if len(text) > 200 else text
+            return _fallback_summary(text, doc_type, entities)
 
         return summary
 
@@ -2542,8 +3272,130 @@ Summary (2-3 sentences):"""
         return text[:200] + "..." if len(text) > 200 else text
 
 
+def _fallback_summary(text: str, doc_type: str, entities: dict) -> str:
+    """Build a basic summary from extracted entities (invoices) or the leading text."""
+    if doc_type == 'invoice' and entities:
+        doc_num = entities.get('document_number', 'N/A')
+        from_party = entities.get('parties', ['Unknown'])[0] if entities.get('parties') else 'Unknown'
+        to_party = entities.get('parties', ['Unknown'])[1] if entities.get('parties', [None, None])[1] else 'Unknown'
+        amount = entities.get('amounts', [{}])[0] if entities.get('amounts') else {}
+        amount_str = f"${amount.get('value', 0)} {amount.get('currency', 'USD')}" if amount else "N/A"
+        dates = entities.get('dates', [])
+        due_date = dates[0] if dates else 'N/A'
+        return f"Invoice {doc_num} from {from_party} to {to_party} for {amount_str}, due {due_date}"
+
+    return text[:200] + "..." if len(text) > 200 else text
+
+
+def analyze_document_with_ollama(text: str, filename: str, ollama_model: str = "llama3.2") -> dict:
+    """
+    Classify, extract entities from and summarize a document with a single Ollama call.
+
+    The document text is sent (and prefilled by the model) once instead of three
+    times. If the combined response cannot be parsed, falls back to the separate
+    classify -> extract -> summarize calls.
+
+    Args:
+        text: Extracted text from document
+        filename: Original filename
+        ollama_model: Ollama model to use
+
+    Returns:
+        dict with document_type, confidence, entities and summary
+    """
+    if not OLLAMA_AVAILABLE or not text.strip():
+        return {
+            "document_type": "unknown",
+            "confidence": 0.0,
+            "entities": {},
+            "summary": text[:200] + "..." if len(text) > 200 else text
+        }
+
+    try:
+        prompt = f"""Analyze this document. Consider the filename and content.
+
+Filename: {filename}
+
+Content (first 800 chars):
+{text[:800]}
+
+Do three things:
+1. Classify the document into ONE of these categories: invoice, receipt, contract, letter, report, resume, form, certificate, statement, manual, presentation, spreadsheet, note, other
+2. Extract key entities (dates, amounts, parties, document number, reference); use null if not found
+3. Summarize it in 2-3 concise sentences covering what it is, the key parties, important dates/amounts/deadlines and any action items
+
+Respond in JSON format only:
+{{
+  "document_type": "category",
+  "confidence": 0.95,
+  "entities": {{
+    "dates": ["2025-11-24"],
+    "amounts": [{{"value": 800, "currency": "USD"}}],
+    "parties": ["from_name", "to_name"],
+    "document_number": "INV-008",
+    "reference": "REF-123"
+  }},
+  "summary": "2-3 sentence summary"
+}}"""
+
+        result = extract_json_from_response(ollama_generate_cached(ollama_model, prompt, json_format=True))
+        if result and result.get("document_type"):
+            document_type = result.get("document_type", "other")
+            entities = result.get("entities")
+            if not isinstance(entities, dict):
+                entities = {}
+            summary = str(result.get("summary") or "").strip()
+            if len(summary) < 20:
+                summary = _fallback_summary(text, document_type, entities)
+
+            return {
+                "document_type": document_type,
+                "confidence": float(result.get("confidence", 0.7)),
+                "entities": entities,
+                "summary": summary
+            }
+
+        logger.warning("Combined document analysis response not parseable, falling back to separate calls")
+
+    except Exception as e:
+        logger.error(f"Combined document analysis failed: {str(e)}")
+
+    # Entities and summary both only need the document type, so run them side by
+    # side (the summary prompt goes without the entity context in this path)
+    classification = classify_document_with_ollama(text, filename, ollama_model)
+    document_type = classification.get("document_type")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        entities_future = executor.submit(extract_entities_with_ollama, text, document_type, ollama_model)
+        summary_future = executor.submit(generate_intelligent_summary, text, document_type, {}, ollama_model)
+        entities = entities_future.result()
+        summary = summary_future.result()
+
+    return {
+        "document_type": document_type,
+        "confidence": classification.get("confidence"),
+        "entities": entities,
+        "summary": summary
+    }
+
+
 # ===== AUDIO PROCESSING =====
 
+def _get_audio_thumbnail_axes():
+    """
+    Return the shared (figure, axes) used for waveform thumbnails, creating it on first use.
+
+    Building a matplotlib figure is far more expensive than redrawing one, so a single
+    figure is reused. Callers must hold audio_thumbnail_lock while drawing on it.
+    """
+    global audio_thumbnail_figure
+    if audio_thumbnail_figure is None:
+        import matplotlib
+        matplotlib.use('Agg')  # Non-interactive backend
+        import matplotlib.pyplot as plt
+        audio_thumbnail_figure = plt.subplots(figsize=(10, 4), facecolor='#1a1a1a')
+    return audio_thumbnail_figure
+
+
 def generate_audio_thumbnail(audio_path: str, max_size: tuple = (800, 800)) -> Optional[str]:
     """
     Generate a waveform visualization thumbnail for an audio file.
@@ -2558,9 +3410,6 @@ def generate_audio_thumbnail(audio_path: str, max_size: tuple = (800, 800)) -> O
     try:
         import librosa
         import librosa.display
-        import matplotlib.pyplot as plt
-        import matplotlib
-        matplotlib.use('Agg')  # Non-interactive backend
 
         # Parse the original path
         original_path = Path(audio_path)
@@ -2573,39 +3422,44 @@ def generate_audio_thumbnail(audio_path: str, max_size: tuple = (800, 800)) -> O
         thumbnail_filename = original_path.stem + '.jpg'
         thumbnail_path = thumbnail_dir / thumbnail_filename
 
-        # Load audio file (librosa automatically resamples)
-        y, sr = librosa.load(audio_path, duration=60)  # Load first 60 seconds max
-
-        # Create figure with dark theme
-        fig, ax = plt.subplots(figsize=(10, 4), facecolor='#1a1a1a')
-        ax.set_facecolor('#1a1a1a')
-
-        # Plot waveform
-        librosa.display.waveshow(y, sr=sr, ax=ax, color='#00d4ff', alpha=0.8)
-
-        # Styling
-        ax.set_xlabel('Time (s)', color='white', fontsize=10)
-        ax.set_ylabel('Amplitude', color='white', fontsize=10)
-        ax.tick_params(colors='white', labelsize=8)
-        ax.grid(True, alpha=0.2, color='white')
-
-        # Remove top and right spines
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color('white')
-        ax.spines['bottom'].set_color('white')
-
-        # Tight layout
-        plt.tight_layout()
-
-        # Save as JPEG
-        plt.savefig(str(thumbnail_path),
-                   format='jpg',
-                   dpi=100,
-                   bbox_inches='tight',
-                   facecolor='#1a1a1a',
-                   edgecolor='none')
-        plt.close(fig)
+        # Load the first 60 seconds max, resampled on decode: 4 kHz (240k samples)
+        # is ample for an 800px-wide waveform and far less than librosa's 22.05 kHz default
+        y, sr = librosa.load(audio_path, sr=4000, mono=True, duration=60)
+
+        with audio_thumbnail_lock:
+            fig, ax = _get_audio_thumbnail_axes()
+
+            # Reset the shared axes (clearing also drops styling, so reapply it below)
+            ax.clear()
+            ax.set_facecolor('#1a1a1a')
+
+            # Plot waveform. Cap the drawn points at the thumbnail width: beyond
+            # max_points waveshow plots a max-abs envelope computed in NumPy, so
+            # matplotlib rasterizes ~800 points instead of librosa's default 11025
+            librosa.display.waveshow(y, sr=sr, ax=ax, color='#00d4ff', alpha=0.8, max_points=max_size[0])
+
+            # Styling
+            ax.set_xlabel('Time (s)', color='white', fontsize=10)
+            ax.set_ylabel('Amplitude', color='white', fontsize=10)
+            ax.tick_params(colors='white', labelsize=8)
+            ax.grid(True, alpha=0.2, color='white')
+
+            # Remove top and right spines
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+            ax.spines['left'].set_color('white')
+            ax.spines['bottom'].set_color('white')
+
+            # Tight layout
+            fig.tight_layout()
+
+            # Save as JPEG
+            fig.savefig(str(thumbnail_path),
+                        format='jpg',
+                        dpi=100,
+                        bbox_inches='tight',
+                        facecolor='#1a1a1a',
+                        edgecolor='none')
 
         logger.info(f"Generated audio waveform thumbnail: {thumbnail_path}")
         return str(thumbnail_path)
@@ -2618,17 +3472,45 @@ def generate_audio_thumbnail(audio_path: str, max_size: tuple = (800, 800)) -> O
         return None
 
 
+def get_whisper_model():
+    """
+    Lazily load the Whisper model on the first audio request.
+
+    Deployments that never transcribe audio don't spend memory (or VRAM) on it.
+    """
+    global whisper_model
+    if whisper_model is not None or not WHISPER_AVAILABLE:
+        return whisper_model
+
+    with whisper_load_lock:
+        if whisper_model is not None:
+            return whisper_model
+        logger.info("Loading Whisper model...")
+        try:
+            whisper_model = whisper.load_model("base", device=device)
+            logger.info("Whisper model loaded successfully!")
+        except Exception as e:
+            logger.error(f"Failed to load Whisper: {str(e)}")
+    return whisper_model
+
+
 def transcribe_audio(audio_path: str, language: Optional[str] = None) -> Dict:
     """Transcribe audio using Whisper."""
-    if not WHISPER_AVAILABLE or whisper_model is None:
+    whisper_model = get_whisper_model()
+    if whisper_model is None:
         return {"text": "", "language": "unknown", "confidence": 0.0}
 
     try:
-        result = whisper_model.transcribe(
-            audio_path,
-            language=language,
-            fp16=False
-        )
+        with whisper_lock:
+            result = whisper_model.transcribe(
+                audio_path,
+                language=language,
+                # Half precision only helps (and is only supported) on CUDA
+                fp16=device is not None and device.type == "cuda",
+                # Don't feed previous windows back as prompts: avoids repetition loops and
+                # the temperature-fallback re-decodes they trigger on noisy audio
+                condition_on_previous_text=False
+            )
 
         return {
             "text": result["text"].strip(),
@@ -2643,16 +3525,58 @@ def transcribe_audio(audio_path: str, language: Optional[str] = None) -> Dict:
 
 # ===== TEXT EMBEDDING =====
 
-def generate_text_embedding(text: str) -> np.ndarray:
-    """Generate normalized embedding for text using CLIP."""
+def _clip_text_window(text: str) -> str:
+    """
+    Trim text to the leading words CLIP can actually see.
+
+    CLIP keeps 77 tokens and every whitespace-separated word yields at least one
+    token, so the first 77 words tokenize to the same truncated sequence as the
+    whole text; the tokenizer no longer has to walk an entire document.
+    """
+    return " ".join(text.split(maxsplit=CLIP_MAX_WORDS)[:CLIP_MAX_WORDS])
+
+
+def generate_text_embeddings(texts: List[str]) -> np.ndarray:
+    """Generate normalized CLIP embeddings for several texts in one forward pass (one row per text)."""
     # CLIP has max sequence length of 77 tokens, so truncate if needed
-    inputs = clip_processor(text=[text], return_tensors="pt", padding=True, truncation=True, max_length=77).to(device)
+    texts = [_clip_text_window(text) for text in texts]
+    inputs = clip_processor(text=texts, return_tensors="pt", padding=True, truncation=True, max_length=77).to(device)
 
-    with torch.no_grad():
+    with torch.inference_mode(), _autocast():
         text_features = clip_model.get_text_features(**inputs)
 
-    embedding = text_features / text_features.norm(dim=-1, keepdim=True)
-    return embedding.cpu().numpy().flatten()
+    text_features = text_features.float()
+    embeddings = text_features / text_features.norm(dim=-1, keepdim=True)
+    return embeddings.cpu().numpy()
+
+
+@functools.lru_cache(maxsize=4096)
+def _embed_text_cached(text: str) -> bytes:
+    """Cached CLIP embedding of a short text, stored as immutable float32 bytes."""
+    return generate_text_embeddings([text])[0].astype(np.float32).tobytes()
+
+
+def generate_text_embedding(text: str) -> np.ndarray:
+    """Generate normalized embedding for text using CLIP."""
+    # Cache on the part of the text CLIP sees, so documents sharing an opening
+    # hit the cache too; unusually long windows (very long "words") bypass it
+    text = _clip_text_window(text)
+    if len(text) > TEXT_EMBEDDING_CACHE_MAX_CHARS:
+        return generate_text_embeddings([text])[0]
+    return np.frombuffer(_embed_text_cached(text), dtype=np.float32)
+
+
+def embedding_to_list(embedding: Optional[np.ndarray]) -> Optional[List[float]]:
+    """
+    Convert an embedding to a JSON-ready list rounded to EMBEDDING_DECIMALS places.
+
+    Rounding happens in float64 so values serialize as short decimals ("0.012346")
+    rather than the ~19-digit repr of a float32, roughly halving the payload.
+    A missing embedding stays None (serialized as null) instead of a zero vector.
+    """
+    if embedding is None:
+        return None
+    return np.round(embedding.astype(np.float64), EMBEDDING_DECIMALS).tolist()
 
 
 # ===== API ENDPOINTS =====
@@ -2673,7 +3597,8 @@ async def health_check():
         "device": str(device) if device else "unknown",
         "features": {
             "ollama": OLLAMA_AVAILABLE,
-            "whisper": WHISPER_AVAILABLE and whisper_model is not None,
+            # Whisper loads on the first audio request, so report whether it can
+            "whisper": WHISPER_AVAILABLE,
             "tesseract": TESSERACT_AVAILABLE
         }
     }
@@ -2700,15 +3625,16 @@ async def analyze_image(request: AnalyzeImageRequest):
             logger.info(f"Detected SVG file: {request.image_path}")
             try:
                 # Extract SVG content as text (limit to 50KB for database)
+                # Only the first 50000 characters are kept, so never read more than
+                # that (SVGs with embedded base64 images can be hundreds of MB)
                 with open(image_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    svg_content = f.read()
+                    extracted_text = f.read(50000)
+                    truncated = bool(f.read(1))
 
                 # Get file size info
                 file_size = image_path.stat().st_size
-                content_length = len(svg_content)
-
-                # Truncate if too large
-                extracted_text = svg_content[:50000] if content_length > 50000 else svg_content
+                # For truncated files the byte size stands in for the character count
+                content_length = file_size if truncated else len(extracted_text)
 
                 description = f"SVG vector image ({content_length} characters, {file_size} bytes)"
 
@@ -2735,6 +3661,13 @@ async def analyze_image(request: AnalyzeImageRequest):
 
         image = Image.open(image_path).convert("RGB")
 
+        # Generate browser-compatible thumbnail on a worker thread while the models
+        # run (PIL releases the GIL while resizing and encoding)
+        # This converts HEIC and other formats to JPEG for web display
+        thumbnail_future = asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(generate_thumbnail, str(image_path), image=image)
+        )
+
         # Generate caption using selected model
         logger.info(f"Generating caption with model: {request.captioning_model}")
         caption = generate_caption(image, model=request.captioning_model)
@@ -2743,14 +3676,15 @@ async def analyze_image(request: AnalyzeImageRequest):
         logger.info(f"Generating embedding with model: {request.embedding_model}")
         embedding = generate_image_embedding(image, model=request.embedding_model)
 
+        # RGB pixel array shared by face detection and quality analysis
+        img_array = np.array(image) if request.detect_faces or request.analyze_quality else None
+
         # Detect faces
-        face_info = {"count": 0, "locations": [], "encodings": []}
+        face_info = {"count": 0, "locations": [], "encodings": np.empty((0, 128), dtype=np.float32)}
         if request.detect_faces:
-            face_info = detect_faces(image)
+            face_info = detect_faces(image, img_array)
 
-        # Generate browser-compatible thumbnail
-        # This converts HEIC and other formats to JPEG for web display
-        thumbnail_path = generate_thumbnail(str(image_path))
+        thumbnail_path = await thumbnail_future
 
         # ============================================================
         # Maximum Analysis Coverage Features
@@ -2773,7 +3707,7 @@ async def analyze_image(request: AnalyzeImageRequest):
         quality_tier = None
         if request.analyze_quality:
             logger.info("Analyzing image quality")
-            image_quality = analyze_image_quality(image)
+            image_quality = analyze_image_quality(image, img_array)
             quality_tier = image_quality.get("quality_tier")
 
         # Perceptual hashing for duplicate detection
@@ -2800,10 +3734,10 @@ async def analyze_image(request: AnalyzeImageRequest):
             description=caption,
             detailed_description=caption,
             meta_tags=meta_tags,
-            embedding=embedding.tolist(),
+            embedding=embedding_to_list(embedding),
             faces_detected=face_info["count"],
             face_locations=face_info["locations"],
-            face_encodings=face_info["encodings"],
+            face_encodings=face_info["encodings"].tolist(),
             thumbnail_path=thumbnail_path,
             # Maximum analysis coverage fields
             objects_detected=objects_detected,
@@ -2869,23 +3803,27 @@ async def analyze_image_comprehensive(request: AnalyzeImageComprehensiveRequest)
             quick_mode=quick_mode,
         )
 
-        # Run comprehensive analysis
-        result = analyzer.analyze(image, image_metadata)
+        # Generate the thumbnail on a worker thread alongside the analysis
+        thumbnail_future = asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(generate_thumbnail, str(image_path), image=image)
+        )
+
+        # Run comprehensive analysis (blocking Ollama calls, kept off the event loop)
+        result = await asyncio.to_thread(analyzer.analyze, image, image_metadata)
 
         # Generate embedding if requested
         embedding = None
         if request.generate_embedding:
             logger.info(f"Generating embedding with model: {request.embedding_model}")
             embedding_array = generate_image_embedding(image, model=request.embedding_model)
-            embedding = embedding_array.tolist() if embedding_array is not None else None
+            embedding = embedding_to_list(embedding_array) if embedding_array is not None else None
 
         # Detect faces if requested
-        face_info = {"count": 0, "locations": [], "encodings": []}
+        face_info = {"count": 0, "locations": [], "encodings": np.empty((0, 128), dtype=np.float32)}
         if request.detect_faces:
             face_info = detect_faces(image)
 
-        # Generate thumbnail
-        thumbnail_path = generate_thumbnail(str(image_path))
+        thumbnail_path = await thumbnail_future
 
         logger.info(
             f"Comprehensive analysis completed: {result.passes_completed}/{result.passes_completed + result.passes_failed} passes "
@@ -2907,7 +3845,7 @@ async def analyze_image_comprehensive(request: AnalyzeImageComprehensiveRequest)
             embedding=embedding,
             faces_detected=face_info["count"],
             face_locations=face_info["locations"],
-            face_encodings=face_info["encodings"],
+            face_encodings=face_info["encodings"].tolist(),
             thumbnail_path=thumbnail_path,
         )
 
@@ -2928,63 +3866,46 @@ async def analyze_video(request: AnalyzeVideoRequest):
 
         logger.info(f"Analyzing video: {request.video_path}")
 
-        # Get video metadata
-        metadata = get_video_metadata(str(video_path))
+        # Open the video once and share the capture across metadata and frame extraction
+        cap, metadata = _open_video(str(video_path))
 
-        # Generate browser-compatible thumbnail
+        # Generate browser-compatible thumbnail on a worker thread (it opens its own
+        # capture) while the frames are extracted
         # This extracts a frame from the video and converts to JPEG for web display
-        thumbnail_path = generate_video_thumbnail(str(video_path))
+        thumbnail_future = asyncio.get_running_loop().run_in_executor(None, generate_video_thumbnail, str(video_path))
 
         # Extract and analyze frames
         scene_descriptions = []
-        embeddings = []
+        avg_embedding = None
+        frames = []
 
-        if request.extract_frames:
-            # Use smart scene detection for better performance
-            # Falls back to interval-based extraction if scene detection fails
+        try:
+            if request.extract_frames:
+                frames = await asyncio.to_thread(_extract_key_frames, str(video_path), request.frame_interval, cap)
+        finally:
+            cap.release()
+
+        if frames:
+            scene_descriptions = await analyze_video_scenes_async(frames)
+
+            # Embed the key frames in a single batched forward pass. Frames are already
+            # one per detected scene (or per interval), so spread the 5 picks across
+            # the whole list instead of taking the opening ones
+            if len(frames) > 5:
+                key_frames = [frames[i] for i in np.linspace(0, len(frames) - 1, 5, dtype=int)]
+            else:
+                key_frames = frames
+            logger.info(f"Generating embeddings for {len(key_frames)} key frames in one batch")
             try:
-                logger.info(f"Using smart scene detection (threshold={SCENE_THRESHOLD}, min_duration={MIN_SCENE_DURATION})")
-                frames = extract_video_frames_with_scene_detection(
-                    str(video_path),
-                    scene_threshold=SCENE_THRESHOLD,
-                    min_scene_duration_frames=MIN_SCENE_DURATION
+                embeddings = await asyncio.to_thread(
+                    generate_image_embeddings,
+                    [Image.fromarray(frame) for frame in key_frames]
                 )
-
-                # Fallback to interval-based extraction if no frames were extracted
-                if not frames:
-                    logger.warning("Scene detection returned no frames, falling back to interval-based extraction")
-                    frames = extract_video_frames(str(video_path), request.frame_interval)
-
+                avg_embedding = embeddings.mean(axis=0, dtype=np.float32)
             except Exception as e:
-                logger.error(f"Scene detection failed: {str(e)}, falling back to interval-based extraction")
-                frames = extract_video_frames(str(video_path), request.frame_interval)
-
-            scene_descriptions = analyze_video_scenes(frames)
-
-            # Generate embeddings for key frames using parallel processing
-            key_frames = frames[:5]  # Use first 5 frames
-            if key_frames:
-                logger.info(f"Generating embeddings for {len(key_frames)} key frames with {MAX_VIDEO_WORKERS} workers")
+                logger.error(f"Failed to generate key frame embeddings: {str(e)}")
 
-                def _generate_frame_embedding(frame: np.ndarray) -> np.ndarray:
-                    """Helper function for parallel embedding generation."""
-                    pil_image = Image.fromarray(frame)
-                    return generate_image_embedding(pil_image)
-
-                with ThreadPoolExecutor(max_workers=MAX_VIDEO_WORKERS) as executor:
-                    # Submit all frames for embedding generation
-                    futures = [executor.submit(_generate_frame_embedding, frame) for frame in key_frames]
-
-                    # Collect results as they complete
-                    for future in as_completed(futures):
-                        try:
-                            emb = future.result()
-                            embeddings.append(emb)
-                        except Exception as e:
-                            logger.error(f"Failed to generate embedding: {str(e)}")
-
-        # Average embeddings
-        avg_embedding = np.mean(embeddings, axis=0) if embeddings else np.zeros(512)
+        thumbnail_path = await thumbnail_future
 
         return AnalyzeVideoResponse(
             duration_seconds=metadata.get("duration_seconds", 0),
@@ -2992,7 +3913,7 @@ async def analyze_video(request: AnalyzeVideoRequest):
             fps=metadata.get("fps", 0),
             resolution=metadata.get("resolution", "unknown"),
             scene_descriptions=scene_descriptions,
-            embedding=avg_embedding.tolist(),
+            embedding=embedding_to_list(avg_embedding),
             objects_detected=[],
             thumbnail_path=thumbnail_path
         )
@@ -3004,21 +3925,30 @@ async def analyze_video(request: AnalyzeVideoRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def extract_pdf_text(pdf_path: str) -> str:
-    """Extract native text from PDF (not OCR)."""
+def extract_pdf_text(pdf_path: str, early_exit_pages: Optional[int] = None) -> str:
+    """
+    Extract native text from PDF (not OCR).
+
+    With early_exit_pages set, gives up and returns "" when the first that many
+    pages hold fewer than 20 characters of text (a scanned PDF), so the caller can
+    move on to OCR without walking the rest of the document.
+    """
+    if not PYMUPDF_AVAILABLE:
+        return ""
+
     try:
-        import fitz  # PyMuPDF
-        doc = fitz.open(pdf_path)
-        text_parts = []
-
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
-            if text.strip():
-                text_parts.append(text.strip())
-
-        doc.close()
-        result = "\n\n".join(text_parts)
+        # One pass over the pages; the with-block closes the document even if a
+        # page fails to parse. PyMuPDF is not thread-safe and holds the GIL, so
+        # pages are not spread across threads.
+        page_texts = []
+        with fitz.open(pdf_path) as doc:
+            for page_num, page in enumerate(doc, 1):
+                page_texts.append(page.get_text().strip())
+                if page_num == early_exit_pages and sum(len(text) for text in page_texts) < 20:
+                    logger.info(f"No native text in the first {page_num} PDF pages, treating as scanned")
+                    return ""
+
+        result = "\n\n".join([text for text in page_texts if text])
         logger.info(f"Extracted {len(result)} characters of native text from PDF")
         return result
 
@@ -3030,25 +3960,41 @@ def extract_pdf_text(pdf_path: str) -> str:
 def extract_text_document(doc_path: str) -> str:
     """Extract text from plain text files (.txt, .md, .log, etc.)."""
     try:
-        with open(doc_path, 'r', encoding='utf-8') as f:
-            text = f.read()
-        logger.info(f"Extracted {len(text)} characters from text document")
-        return text
-    except UnicodeDecodeError:
-        # Try with different encoding
+        # Read the bytes once; the latin-1 fallback decodes the same buffer
+        # instead of reading the file a second time
+        with open(doc_path, 'rb') as f:
+            raw = f.read()
         try:
-            with open(doc_path, 'r', encoding='latin-1') as f:
-                text = f.read()
+            text = raw.decode('utf-8')
+            logger.info(f"Extracted {len(text)} characters from text document")
+        except UnicodeDecodeError:
+            # Try with different encoding
+            text = raw.decode('latin-1')
             logger.info(f"Extracted {len(text)} characters from text document (latin-1)")
-            return text
-        except Exception as e:
-            logger.error(f"Text document extraction failed: {str(e)}")
-            return ""
+        return text
     except Exception as e:
         logger.error(f"Text document extraction failed: {str(e)}")
         return ""
 
 
+# Direct text extractors by file extension (PDFs and images are handled separately
+# because they may need the OCR fallback)
+TEXT_EXTRACTORS = {
+    # Word documents
+    '.docx': extract_word_document,
+    '.doc': extract_word_document,
+    '.rtf': extract_word_document,
+    '.odt': extract_word_document,
+    # Plain text documents
+    '.txt': extract_text_document,
+    '.md': extract_text_document,
+    '.log': extract_text_document,
+    '.csv': extract_text_document,
+    '.json': extract_text_document,
+    '.xml': extract_text_document,
+}
+
+
 @app.post("/analyze-document", response_model=AnalyzeDocumentResponse)
 async def analyze_document(request: AnalyzeDocumentRequest):
     """Analyze document with OCR and text extraction."""
@@ -3061,37 +4007,39 @@ async def analyze_document(request: AnalyzeDocumentRequest):
 
         # Generate browser-compatible thumbnail
         # This renders the first page of PDFs or creates a preview for text files
-        thumbnail_path = generate_document_thumbnail(str(doc_path))
+        # Blocking extraction/model work runs in worker threads so the event loop
+        # keeps serving other requests
+        thumbnail_path = await asyncio.to_thread(generate_document_thumbnail, str(doc_path))
 
         # Extract text based on file type
         extracted_text = ""
         file_extension = doc_path.suffix.lower()
 
-        # Word documents (.docx, .doc, .rtf, .odt)
-        if file_extension in ['.docx', '.doc', '.rtf', '.odt']:
-            logger.info(f"Extracting text from Word document: {file_extension}")
-            extracted_text = extract_word_document(str(doc_path))
-
-        # Plain text documents
-        elif file_extension in ['.txt', '.md', '.log', '.csv', '.json', '.xml']:
-            logger.info(f"Extracting text from plain text document: {file_extension}")
-            extracted_text = extract_text_document(str(doc_path))
+        # Word and plain text documents
+        extractor = TEXT_EXTRACTORS.get(file_extension)
+        if extractor is not None:
+            logger.info(f"Extracting text from {file_extension} document with {extractor.__name__}")
+            extracted_text = await asyncio.to_thread(extractor, str(doc_path))
 
         # PDF documents
         elif file_extension == '.pdf':
             logger.info("Extracting text from PDF document")
-            # Try native text extraction first
-            extracted_text = extract_pdf_text(str(doc_path))
+            # Try native text extraction first; when OCR can take over, stop probing
+            # a scanned PDF after its first few pages
+            will_ocr = request.perform_ocr and OCR_AVAILABLE
+            extracted_text = await asyncio.to_thread(
+                extract_pdf_text, str(doc_path), PDF_TEXT_PROBE_PAGES if will_ocr else None
+            )
 
             # If no text extracted and OCR is requested, perform OCR
-            if not extracted_text.strip() and request.perform_ocr and OCR_AVAILABLE:
+            if not extracted_text.strip() and will_ocr:
                 logger.info(f"No native text found in PDF, performing OCR with engine: {request.ocr_engine}")
-                extracted_text = perform_ocr(str(doc_path), engine=request.ocr_engine)
+                extracted_text = await asyncio.to_thread(perform_ocr, str(doc_path), engine=request.ocr_engine)
 
         # Image documents - perform OCR if requested
         elif request.perform_ocr and OCR_AVAILABLE:
             logger.info(f"Performing OCR on image document: {file_extension} with engine: {request.ocr_engine}")
-            extracted_text = perform_ocr(str(doc_path), engine=request.ocr_engine)
+            extracted_text = await asyncio.to_thread(perform_ocr, str(doc_path), engine=request.ocr_engine)
 
         else:
             logger.warning(f"Unsupported document type for text extraction: {file_extension}")
@@ -3100,7 +4048,7 @@ async def analyze_document(request: AnalyzeDocumentRequest):
         keywords = extract_keywords(extracted_text) if extracted_text else []
 
         # Generate embedding from text
-        embedding = generate_text_embedding(extracted_text) if extracted_text else np.zeros(512)
+        embedding = await asyncio.to_thread(generate_text_embedding, extracted_text) if extracted_text else None
 
         # Intelligent document analysis using Ollama
         document_type = None
@@ -3108,26 +4056,28 @@ async def analyze_document(request: AnalyzeDocumentRequest):
         entities = None
         summary = None
 
-        # Debug: Check Ollama processing conditions
-        logger.info(f"DEBUG: extracted_text length: {len(extracted_text) if extracted_text else 0}")
-        logger.info(f"DEBUG: request.use_ollama: {request.use_ollama}")
-        logger.info(f"DEBUG: OLLAMA_AVAILABLE: {OLLAMA_AVAILABLE}")
+        # Debug: Check Ollama processing conditions (lazy %-formatting: nothing is
+        # formatted unless DEBUG logging is enabled)
+        logger.debug("extracted_text length: %d, use_ollama: %s, OLLAMA_AVAILABLE: %s",
+                     len(extracted_text) if extracted_text else 0, request.use_ollama, OLLAMA_AVAILABLE)
 
-        if extracted_text and request.use_ollama and OLLAMA_AVAILABLE:
+        if extracted_text and request.use_ollama and OLLAMA_AVAILABLE and len(extracted_text.strip()) < OLLAMA_MIN_TEXT_CHARS:
+            # Too little text for an LLM round-trip to add anything; it is its own summary
+            logger.info(f"Skipping Ollama analysis for short document ({len(extracted_text.strip())} chars)")
+            summary = extracted_text.strip()
+        elif extracted_text and request.use_ollama and OLLAMA_AVAILABLE:
             logger.info("Starting Ollama intelligent analysis...")
             try:
-                # 1. Classify document type
-                classification = classify_document_with_ollama(extracted_text, doc_path.name, request.ollama_model)
-                document_type = classification.get("document_type")
-                classification_confidence = classification.get("confidence")
+                # Classify, extract entities and summarize in one LLM call
+                analysis = await asyncio.to_thread(analyze_document_with_ollama, extracted_text, doc_path.name, request.ollama_model)
+                document_type = analysis.get("document_type")
+                classification_confidence = analysis.get("confidence")
                 logger.info(f"Classified as {document_type} (confidence: {classification_confidence})")
 
-                # 2. Extract entities based on document type
-                entities = extract_entities_with_ollama(extracted_text, document_type, request.ollama_model)
-                logger.info(f"Extracted entities: {entities}")
+                entities = analysis.get("entities")
+                logger.debug("Extracted entities: %s", entities)
 
-                # 3. Generate intelligent summary
-                summary = generate_intelligent_summary(extracted_text, document_type, entities, request.ollama_model)
+                summary = analysis.get("summary")
                 logger.info(f"Generated summary: {summary[:100]}...")
 
             except Exception as e:
@@ -3142,7 +4092,7 @@ async def analyze_document(request: AnalyzeDocumentRequest):
             page_count=None,
             summary=summary,
             keywords=keywords,
-            embedding=embedding.tolist(),
+            embedding=embedding_to_list(embedding),
             thumbnail_path=thumbnail_path,
             document_type=document_type,
             classification_confidence=classification_confidence,
@@ -3171,19 +4121,19 @@ async def transcribe_audio_endpoint(request: TranscribeAudioRequest):
 
         # Generate waveform visualization thumbnail
         # This creates a visual representation of the audio waveform
-        thumbnail_path = generate_audio_thumbnail(str(audio_path))
+        thumbnail_path = await asyncio.to_thread(generate_audio_thumbnail, str(audio_path))
 
         # Transcribe audio
-        result = transcribe_audio(str(audio_path), request.language)
+        result = await asyncio.to_thread(transcribe_audio, str(audio_path), request.language)
 
         # Generate embedding from transcribed text
-        embedding = generate_text_embedding(result["text"]) if result["text"] else np.zeros(512)
+        embedding = await asyncio.to_thread(generate_text_embedding, result["text"]) if result["text"] else None
 
         return TranscribeAudioResponse(
             text=result["text"],
             language=result["language"],
             confidence=result["confidence"],
-            embedding=embedding.tolist(),
+            embedding=embedding_to_list(embedding),
             thumbnail_path=thumbnail_path
         )
 
@@ -3202,9 +4152,9 @@ async def embed_text(request: EmbedTextRequest):
             raise HTTPException(status_code=503, detail="Models not loaded yet")
 
         logger.info(f"Embedding text query: {request.query}")
-        embedding = generate_text_embedding(request.query)
+        embedding = await asyncio.to_thread(generate_text_embedding, request.query)
 
-        return EmbedTextResponse(embedding=embedding.tolist())
+        return EmbedTextResponse(embedding=embedding_to_list(embedding))
 
     except HTTPException:
         raise
@@ -3225,7 +4175,8 @@ async def extract_email_endpoint(request: ExtractEmailRequest):
 
         result = extract_email(str(email_path))
 
-        return ExtractEmailResponse(**result)
+        # Plain dict from our own extractor; FastAPI validates it against response_model once
+        return result
 
     except HTTPException:
         raise
@@ -3246,7 +4197,8 @@ async def extract_archive_metadata_endpoint(request: ExtractArchiveMetadataReque
 
         result = extract_archive_metadata(str(archive_path))
 
-        return ExtractArchiveMetadataResponse(**result)
+        # Plain dict from our own extractor; FastAPI validates it against response_model once
+        return result
 
     except HTTPException:
         raise
@@ -3267,7 +4219,8 @@ async def analyze_code_file_endpoint(request: AnalyzeCodeFileRequest):
 
         result = analyze_code_file(str(code_path))
 
-        return AnalyzeCodeFileResponse(**result)
+        # Plain dict from our own analyzer; FastAPI validates it against response_model once
+        return result
 
     except HTTPException:
         raise
@@ -0,0 +1,33 @@
+"""
+The torchvision pipeline from _build_image_transform must match the HF image
+processor it replaces, pixel for pixel.
+"""
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+main_multimedia = pytest.importorskip("main_multimedia")
+
+from PIL import Image
+
+
+def _random_image(width: int, height: int) -> Image.Image:
+    rng = np.random.default_rng(width * 10007 + height)
+    return Image.fromarray(rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8))
+
+
+# After the 224 shortest-edge resize these leave an odd margin around the 224 crop
+# (303 - 224 = 79, 335 - 224 = 111), where rounding and flooring the crop offset disagree.
+@pytest.mark.parametrize("width, height", [(303, 224), (305, 225), (225, 305), (640, 427)])
+def test_transform_matches_hf_processor_on_odd_sizes(width, height):
+    processor = transformers.CLIPImageProcessor()
+    transform = main_multimedia._build_image_transform(processor)
+    assert transform is not None
+
+    image = _random_image(width, height)
+    expected = processor(images=image, return_tensors="pt")["pixel_values"][0]
+    actual = transform(image)
+
+    assert actual.shape == expected.shape
+    torch.testing.assert_close(actual, expected, rtol=0, atol=1e-5)